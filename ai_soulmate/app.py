@@ -0,0 +1,320 @@
+import streamlit as st
+from utils.initialize import (
+    initialize_chat,
+    get_text_model,
+    history_page,
+    lease_text_model,
+    load_earlier_messages,
+    model_key,
+    save_turn,
+)
+from utils.model_registry import get_model_registry
+from utils.scheduler import SchedulerBusy, get_scheduler
+from utils import service_client
+from utils.service_client import service_enabled
+from utils.gen_avatar import generate_ai_avatar
+from utils.transcribe import record_and_transcribe, warm_up_voice_model
+from utils.gen_response import generate_chat_response, generate_remote_chat_response, start_turn
+from utils.tts_backends import BACKENDS, TTS_BACKEND, available_backends, get_tts_backend
+from utils.telemetry import MILESTONES, STAGES, get_telemetry, start_metrics_server
+from utils.segmenter import SentenceSegmenter
+from utils.streaming import stream_response
+from utils.customize import open_customization_modal
+from utils.context import default_context_budget
+from PIL import Image
+
+img = Image.open("./nexalogo.png")
+st.set_page_config(page_title="AI Soulmate", page_icon=img)
+warm_up_voice_model()
+start_metrics_server()
+
+# returns a placeholder until the background job has stored the avatar
+ai_avatar = generate_ai_avatar()
+
+default_model = "llama3-uncensored"
+model_options = ["llama3-uncensored", "llama2", "llama3.1", "tinyllama", "Use Model From Nexa Model Hub", "Local Model"]
+# turns shown in the sidebar timing panel
+TIMING_TURNS = 5
+
+
+def respond(turn=None):
+    turn = turn or start_turn()
+    with st.chat_message("assistant", avatar=st.session_state.get("ai_avatar", ai_avatar)):
+        speech = get_tts_backend(st.session_state.tts_backend).load().SpeechSession(
+            st.session_state.voice, turn=turn, **st.session_state.speech_options
+        )
+        try:
+            speech.render()
+            segmenter = SentenceSegmenter()
+
+            def speak(text):
+                for sentence in segmenter.feed(text):
+                    speech.say(sentence)
+
+            try:
+                if service_enabled():
+                    chunks = generate_remote_chat_response(
+                        st.session_state.model_key, st.session_state.model_params, turn=turn
+                    )
+                    full_response = stream_response(chunks, st.empty(), on_text=speak)
+                else:
+                    with lease_text_model(st.session_state.model_key) as nexa_model:
+                        full_response = stream_response(
+                            generate_chat_response(nexa_model, turn=turn), st.empty(), on_text=speak
+                        )
+            except SchedulerBusy:
+                st.warning("I'm chatting with a lot of people right now, please try again in a moment.")
+                full_response = None
+            for sentence in segmenter.flush():
+                speech.say(sentence)
+        finally:
+            # runs on errors too, so speech threads, audio streams and the turn are always closed
+            try:
+                speech.finish()
+            except Exception as e:
+                # the reply is still shown and saved, just not spoken
+                st.warning(f"Could not play the reply: {e}")
+            turn.finish()
+
+    if full_response is None:
+        # drop the unanswered message so it can be sent again
+        st.session_state.messages.pop()
+        st.session_state.pop("intro_sent", None)
+        return
+
+    save_turn(full_response)
+
+
+def main():
+    col1, col2 = st.columns([5, 5], vertical_alignment="center")
+    with col1:
+        st.title("AI Soulmate")
+    with col2:
+        avatar_path = st.session_state.get("ai_avatar", ai_avatar)
+        if st.session_state.get("modal_open") and "uploaded_avatar" in st.session_state:
+            avatar_path = st.session_state.uploaded_avatar
+        st.image(avatar_path, width=150)
+        open_customization_modal()
+    st.caption("Powered by Nexa AI")
+
+    st.sidebar.header("Model Configuration")
+    model_path = st.sidebar.selectbox("Select a Model", model_options, index=model_options.index(default_model))
+    
+    if model_path == "Local Model":
+        local_model_path = st.sidebar.text_input("Enter local model path")
+        if not local_model_path:
+            st.warning("Please enter a valid local model path to proceed.")
+            st.stop()
+        hub_model_name = None
+    elif model_path == "Use Model From Nexa Model Hub":
+        hub_model_name = st.sidebar.text_input("Enter model name from Nexa Model Hub")
+        if not hub_model_name:
+            st.warning("Please enter a valid model name to proceed.")
+            st.stop()
+        local_model_path = None
+    else:
+        local_model_path = None
+        hub_model_name = None
+    
+    if ("current_model_path" not in st.session_state or 
+        st.session_state.current_model_path != model_path or
+        (model_path == "Local Model" and local_model_path != st.session_state.current_local_model_path) or
+        (model_path == "Use Model From Nexa Model Hub" and hub_model_name != st.session_state.current_hub_model_name)):
+        st.session_state.current_model_path = model_path
+        st.session_state.current_local_model_path = local_model_path
+        st.session_state.current_hub_model_name = hub_model_name
+        if model_path == "Local Model" and local_model_path:
+            st.session_state.model_key = model_key(local_path=local_model_path)
+        elif model_path == "Use Model From Nexa Model Hub" and hub_model_name:
+            st.session_state.model_key = model_key(hub_model_name)
+        else:
+            st.session_state.model_key = model_key(model_path)
+        st.session_state.pop("model_info", None)
+        st.session_state.messages = []
+        
+        if "intro_sent" in st.session_state:
+            del st.session_state["intro_sent"]
+
+    if not model_path:
+        st.warning(
+            "Please enter a valid path or identifier for the model in Nexa Model Hub to proceed."
+        )
+        st.stop()
+
+    if (
+        "current_model_path" not in st.session_state
+        or st.session_state.current_model_path != model_path
+    ):
+        st.session_state.current_model_path = model_path
+        st.session_state.model_key = model_key(model_path)
+        st.session_state.pop("model_info", None)
+
+    if service_enabled():
+        # the service hosts the model; this session keeps its own generation parameters
+        if "model_info" not in st.session_state:
+            with st.spinner("Hang tight! Loading model, I'll be right back with you : )"):
+                st.session_state.model_info = service_client.load_model(st.session_state.model_key)
+            st.session_state.model_params = dict(st.session_state.model_info["params"])
+        params = st.session_state.model_params
+        n_ctx = st.session_state.model_info["n_ctx"]
+        default_budget = st.session_state.model_info["context_budget"]
+    else:
+        # the model may have been evicted to make room for another session's model
+        if not get_model_registry().is_loaded(st.session_state.model_key):
+            with st.spinner("Hang tight! Loading model, I'll be right back with you : )"):
+                get_text_model(st.session_state.model_key)
+        nexa_model = get_text_model(st.session_state.model_key)
+        params = nexa_model.params
+        n_ctx = nexa_model.model.n_ctx()
+        default_budget = default_context_budget(nexa_model)
+
+    st.sidebar.header("Generation Parameters")
+    temperature = st.sidebar.slider(
+        "Temperature", 0.0, 1.0, params["temperature"]
+    )
+    max_new_tokens = st.sidebar.slider(
+        "Max New Tokens", 1, 1000, params["max_new_tokens"]
+    )
+    top_k = st.sidebar.slider(
+        "Top K", 1, 100, params["top_k"]
+    )
+    top_p = st.sidebar.slider(
+        "Top P", 0.0, 1.0, params["top_p"]
+    )
+    context_budget = st.sidebar.slider(
+        "Context Budget (tokens)",
+        256,
+        n_ctx,
+        params.get("context_budget", default_budget),
+    )
+
+    params.update(
+        {
+            "temperature": temperature,
+            "max_new_tokens": max_new_tokens,
+            "top_k": top_k,
+            "top_p": top_p,
+            "context_budget": context_budget,
+        }
+    )
+
+    st.sidebar.header("Voice Output")
+    # backends whose packages are not installed are left out
+    backend_names = available_backends()
+    st.sidebar.selectbox(
+        "Speak Replies With",
+        backend_names,
+        index=backend_names.index(TTS_BACKEND if TTS_BACKEND in backend_names else "null"),
+        format_func=lambda name: BACKENDS[name].label,
+        key="tts_backend",
+    )
+    tts = get_tts_backend(st.session_state.tts_backend)
+    if st.session_state.get("voice") not in tts.voices.values():
+        st.session_state.voice = tts.default_voice
+    # the backend's libraries are imported the first time a session picks it
+    speech_module = tts.load()
+    speech_module.warm_up()
+    st.session_state.speech_options = speech_module.sidebar()
+
+    if "context_stats" in st.session_state:
+        stats = st.session_state.context_stats
+        st.sidebar.caption(
+            f"Last prompt: {stats['prompt_tokens']} of {stats['full_tokens']} tokens "
+            f"({stats['saved_tokens']} saved by dropping {stats['dropped_messages']} older messages)"
+        )
+
+    if service_enabled():
+        service_stats = service_client.get_stats(st.session_state.model_key)
+        registry_stats, queue_stats = service_stats["registry"], service_stats["queue"]
+    else:
+        registry_stats = get_model_registry().stats()
+        queue_stats = get_scheduler(nexa_model).stats()
+    with st.sidebar.expander(
+        f"Loaded Models ({registry_stats['used'] / 1024**3:.1f} of {registry_stats['budget'] / 1024**3:.1f} GB)"
+    ):
+        for model in registry_stats["models"]:
+            status = f"{model['refs']} generating" if model["refs"] else f"idle {model['idle_seconds']:.0f}s"
+            st.caption(f"{model['key'][1]}: {model['size'] / 1024**3:.2f} GB, {status}")
+        st.caption(f"{registry_stats['loads']} loads, {registry_stats['evictions']} evictions")
+
+    if queue_stats:
+        st.sidebar.caption(
+            f"Queue: {queue_stats['queue_depth']} waiting, "
+            f"wait {queue_stats['wait_avg']:.1f}s avg / {queue_stats['wait_p95']:.1f}s p95, "
+            f"{queue_stats['rejected']} turned away"
+        )
+
+    if st.sidebar.checkbox("Show Turn Timings"):
+        # one column per recent turn, newest first, in seconds
+        turns = get_telemetry().recent(TIMING_TURNS)[::-1]
+        if turns:
+            rows = STAGES + MILESTONES
+            table = {"stage": rows}
+            for i, record in enumerate(turns):
+                values = {**record["spans"], **record["marks"]}
+                table[f"#{i + 1}"] = [f"{values[name]:.2f}" if name in values else "" for name in rows]
+            st.sidebar.table(table)
+        else:
+            st.sidebar.caption("No turns yet.")
+
+    initialize_chat()
+
+    # check if customization was just applied:
+    if st.session_state.get("customization_applied", False):
+        name = st.session_state.soulmate_name
+        gender = st.session_state.soulmate_gender
+        custom_instructions = st.session_state.custom_instructions
+        voice = st.session_state.voice
+
+        # introduction = f"Hi, I'm {name}, your perfect {gender.lower()} soulmate. {custom_instructions}"
+        # st.session_state.messages.append({"role": "assistant", "content": introduction})
+
+        # with st.chat_message(
+        #     "assistant", avatar=st.session_state.get("ai_avatar", ai_avatar)
+        # ):
+        #     st.write(introduction)
+
+        # generate_and_play_response(introduction, voice_id)
+
+        st.session_state.customization_applied = False  # reset the flag
+
+    # only the newest page is rendered on each rerun; older pages are read from the store on request
+    history, has_earlier = history_page()
+    if has_earlier:
+        st.button("Load earlier messages", on_click=load_earlier_messages)
+    for message in history:
+        if message["role"] == "user":
+            with st.chat_message(message["role"]):
+                st.markdown(message["content"])
+        else:
+            with st.chat_message(message["role"], avatar=st.session_state.get("ai_avatar", ai_avatar)):
+                st.markdown(message["content"])
+
+    if "intro_sent" not in st.session_state:
+        st.session_state.messages.append({"role": "user", "content": "hello, please intro your self in 30 words.", "visible": False})
+        st.session_state.intro_sent = True
+            
+        respond()
+
+    if st.button("🎙️ Start Voice Chat"):
+        turn = start_turn()
+        transcribed_text = record_and_transcribe(turn=turn)
+        if transcribed_text:
+            st.session_state.messages.append(
+                {"role": "user", "content": transcribed_text}
+            )
+            with st.chat_message("user"):
+                st.markdown(transcribed_text)
+
+            respond(turn)
+
+    if prompt := st.chat_input("Say something..."):
+        st.session_state.messages.append({"role": "user", "content": prompt})
+        with st.chat_message("user"):
+            st.markdown(prompt)
+
+        respond()
+
+
+if __name__ == "__main__":
+    main()
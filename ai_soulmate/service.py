@@ -0,0 +1,262 @@
+"""Headless inference service for AI Soulmate.
+
+Hosts the chat models and Whisper, synthesizes speech with Bark or proxies
+OpenAI speech, and streams results over HTTP so the Streamlit app can run as a
+thin client (set SOULMATE_SERVICE_URL). Each speech backend is imported on its
+first request; TTS_BACKEND=bark loads Bark at startup instead.
+
+Usage: TTS_BACKEND=bark python ai_soulmate/service.py [--host 127.0.0.1] [--port 8600] [--workers 1]
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import struct
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from aiohttp import web
+from utils.context import default_context_budget
+from utils.gen_response import complete_chat
+from utils.initialize import get_text_model, lease_text_model
+from utils.model_registry import get_model_registry
+from utils.scheduler import SchedulerBusy, get_scheduler
+from utils.streaming import chunk_text
+from utils.transcribe import get_voice_model
+from utils.tts_backends import get_tts_backend
+
+SERVICE_HOST = os.environ.get("SERVICE_HOST", "127.0.0.1")
+SERVICE_PORT = int(os.environ.get("SERVICE_PORT", "8600"))
+
+# Whisper and Bark each run one request at a time, OpenAI speech runs on its own pool;
+# chat goes through the model scheduler
+_whisper_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="whisper")
+_speech_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="bark")
+
+
+def _line(event: dict) -> bytes:
+    return json.dumps(event).encode("utf-8") + b"\n"
+
+
+def _ndjson_response() -> web.StreamResponse:
+    return web.StreamResponse(headers={"Content-Type": "application/x-ndjson"})
+
+
+def _close(chunks):
+    try:
+        chunks.close()
+    except ValueError:
+        # still being read on an executor thread; the scheduler cancels the job once it stops
+        pass
+
+
+async def health(request: web.Request) -> web.Response:
+    return web.json_response({"status": "ok"})
+
+
+async def load_model(request: web.Request) -> web.Response:
+    key = tuple((await request.json())["model"])
+    nexa_model = await asyncio.get_running_loop().run_in_executor(None, get_text_model, key)
+    return web.json_response(
+        {
+            "params": nexa_model.params,
+            "n_ctx": nexa_model.model.n_ctx(),
+            "context_budget": default_context_budget(nexa_model),
+        },
+        dumps=lambda obj: json.dumps(obj, default=str),
+    )
+
+
+async def stats(request: web.Request) -> web.Response:
+    registry = get_model_registry()
+    result = {"registry": registry.stats(), "queue": None}
+    if "model" in request.query:
+        key = tuple(json.loads(request.query["model"]))
+        # a stats poll must not load the model or make it look recently used
+        nexa_model = registry.peek(key)
+        if nexa_model is not None:
+            result["queue"] = get_scheduler(nexa_model).stats()
+    return web.json_response(result)
+
+
+async def chat(request: web.Request) -> web.StreamResponse:
+    body = await request.json()
+    loop = asyncio.get_running_loop()
+    lease = lease_text_model(tuple(body["model"]))
+    nexa_model = await loop.run_in_executor(None, lease.__enter__)
+    try:
+        params = {**nexa_model.params, **body.get("params", {})}
+        try:
+            context_stats, chunks = await loop.run_in_executor(
+                None,
+                complete_chat,
+                nexa_model,
+                body["messages"],
+                params,
+                body.get("session_id", request.remote),
+                None,
+                body.get("memories"),
+            )
+        except SchedulerBusy as e:
+            raise web.HTTPServiceUnavailable(text=str(e))
+
+        response = _ndjson_response()
+        try:
+            await response.prepare(request)
+            await response.write(_line({"context_stats": context_stats}))
+            while True:
+                chunk = await loop.run_in_executor(None, next, chunks, None)
+                if chunk is None:
+                    break
+                text = chunk_text(chunk)
+                if text:
+                    await response.write(_line({"text": text}))
+        finally:
+            _close(chunks)
+        await response.write_eof()
+        return response
+    finally:
+        lease.__exit__(None, None, None)
+
+
+async def transcribe(request: web.Request) -> web.StreamResponse:
+    audio = np.frombuffer(await request.read(), dtype=np.float32)
+    options = {"beam_size": int(request.query.get("beam_size", "5"))}
+    if "initial_prompt" in request.query:
+        options["initial_prompt"] = request.query["initial_prompt"]
+    if "condition_on_previous_text" in request.query:
+        options["condition_on_previous_text"] = request.query["condition_on_previous_text"] == "true"
+
+    loop = asyncio.get_running_loop()
+    # faster-whisper decodes lazily, so each segment is sent as soon as it is ready
+    segments = await loop.run_in_executor(
+        _whisper_executor, lambda: iter(get_voice_model().model.transcribe(audio, **options)[0])
+    )
+    response = _ndjson_response()
+    await response.prepare(request)
+    while True:
+        segment = await loop.run_in_executor(_whisper_executor, next, segments, None)
+        if segment is None:
+            break
+        await response.write(_line({"text": segment.text, "start": segment.start, "end": segment.end}))
+    await response.write_eof()
+    return response
+
+
+class _QueueSink:
+    # lets stream_speech write from a pool thread into the event loop
+    def __init__(self, loop: asyncio.AbstractEventLoop, chunks: asyncio.Queue):
+        self.loop = loop
+        self.chunks = chunks
+
+    def write(self, data):
+        self.loop.call_soon_threadsafe(self.chunks.put_nowait, bytes(data))
+
+    def close(self):
+        self.loop.call_soon_threadsafe(self.chunks.put_nowait, None)
+
+
+async def speech(request: web.Request) -> web.StreamResponse:
+    # pcm is synthesized with Bark, mp3 comes from OpenAI
+    body = await request.json()
+    speech_format = body.get("format", "pcm")
+    if speech_format == "pcm":
+        return await bark_speech(request, body)
+    if speech_format == "mp3":
+        return await openai_speech(request, body)
+    raise web.HTTPBadRequest(text=f"unknown format {speech_format!r}")
+
+
+async def bark_speech(request: web.Request, body: dict) -> web.StreamResponse:
+    from utils.bark_speech import SAMPLE_RATE, synthesize_chunks
+    from utils.bark_tiers import BARK_TIER, TIER_OPTIONS
+
+    texts = body["texts"]
+    voice = body.get("voice", "v2/en_speaker_9")
+    tier = body.get("tier", BARK_TIER)
+    if tier not in TIER_OPTIONS:
+        raise web.HTTPBadRequest(text=f"unknown tier {tier!r}")
+
+    audio_arrays = await asyncio.get_running_loop().run_in_executor(
+        _speech_executor, synthesize_chunks, texts, voice, tier
+    )
+    response = web.StreamResponse(
+        headers={"Content-Type": "application/octet-stream", "X-Sample-Rate": str(SAMPLE_RATE)}
+    )
+    await response.prepare(request)
+    for audio_array in audio_arrays:
+        data = np.ascontiguousarray(audio_array, dtype=np.float32).tobytes()
+        await response.write(struct.pack("<I", len(data)) + data)
+    await response.write_eof()
+    return response
+
+
+async def openai_speech(request: web.Request, body: dict) -> web.StreamResponse:
+    from utils.openai_speech import get_tts_pool, stream_speech
+
+    text = body["text"]
+    voice = body.get("voice", "nova")
+
+    loop = asyncio.get_running_loop()
+    sink = _QueueSink(loop, asyncio.Queue())
+
+    def fetch():
+        try:
+            stream_speech(text, voice, sink)
+        finally:
+            sink.close()
+
+    fetched = loop.run_in_executor(get_tts_pool(), fetch)
+    response = web.StreamResponse(headers={"Content-Type": "audio/mpeg"})
+    await response.prepare(request)
+    while True:
+        data = await sink.chunks.get()
+        if data is None:
+            break
+        await response.write(data)
+    await fetched
+    await response.write_eof()
+    return response
+
+
+def create_app() -> web.Application:
+    get_tts_backend().load().warm_up()
+    app = web.Application(client_max_size=64 * 1024 * 1024)
+    app.add_routes(
+        [
+            web.get("/healthz", health),
+            web.post("/v1/models/load", load_model),
+            web.get("/v1/stats", stats),
+            web.post("/v1/chat", chat),
+            web.post("/v1/transcribe", transcribe),
+            web.post("/v1/speech", speech),
+        ]
+    )
+    return app
+
+
+def serve(host: str, port: int, reuse_port: bool = False):
+    web.run_app(create_app(), host=host, port=port, reuse_port=reuse_port)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default=SERVICE_HOST)
+    parser.add_argument("--port", type=int, default=SERVICE_PORT)
+    parser.add_argument("--workers", type=int, default=1, help="processes sharing the port, each with its own models")
+    args = parser.parse_args()
+
+    if args.workers == 1:
+        serve(args.host, args.port)
+        return
+
+    context = multiprocessing.get_context("spawn")
+    workers = [context.Process(target=serve, args=(args.host, args.port, True)) for _ in range(args.workers)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+
+if __name__ == "__main__":
+    main()
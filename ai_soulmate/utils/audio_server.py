@@ -0,0 +1,120 @@
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+AUDIO_SERVER_HOST = os.environ.get("AUDIO_SERVER_HOST", "127.0.0.1")
+AUDIO_SERVER_PORT = int(os.environ.get("AUDIO_SERVER_PORT", "0"))
+# URL the browser uses to reach the server, e.g. when it sits behind a proxy
+AUDIO_PUBLIC_URL = os.environ.get("AUDIO_PUBLIC_URL")
+MAX_STREAMS = 64
+
+
+class AudioStream:
+    # Audio bytes written by the TTS worker and read by any number of HTTP
+    # clients. Readers start from the beginning and block until more data
+    # arrives, so the browser can start playing before synthesis has finished.
+
+    def __init__(self, content_type: str = "audio/mpeg"):
+        self.id = uuid.uuid4().hex
+        self.content_type = content_type
+        self.closed = False
+        self._chunks = []
+        self._condition = threading.Condition()
+
+    def write(self, data: bytes):
+        if not data:
+            return
+        with self._condition:
+            self._chunks.append(bytes(data))
+            self._condition.notify_all()
+
+    def close(self):
+        with self._condition:
+            self.closed = True
+            self._condition.notify_all()
+
+    def __iter__(self):
+        index = 0
+        while True:
+            with self._condition:
+                while index >= len(self._chunks) and not self.closed:
+                    self._condition.wait()
+                if index >= len(self._chunks):
+                    return
+                chunk = self._chunks[index]
+            index += 1
+            yield chunk
+
+
+class _AudioHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        stream = self.server.get_stream(self.path.rstrip("/").rsplit("/", 1)[-1])
+        if stream is None:
+            self.send_error(404)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", stream.content_type)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.send_header("Cache-Control", "no-store")
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.end_headers()
+        try:
+            for chunk in stream:
+                self.wfile.write(b"%X\r\n%s\r\n" % (len(chunk), chunk))
+                self.wfile.flush()
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+class AudioServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, host: str, port: int):
+        super().__init__((host, port), _AudioHandler)
+        self._streams = OrderedDict()
+        self._lock = threading.Lock()
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    @property
+    def base_url(self) -> str:
+        if AUDIO_PUBLIC_URL:
+            return AUDIO_PUBLIC_URL.rstrip("/")
+        host = "localhost" if self.server_address[0] in ("127.0.0.1", "0.0.0.0") else self.server_address[0]
+        return f"http://{host}:{self.server_address[1]}"
+
+    def open_stream(self, content_type: str = "audio/mpeg") -> AudioStream:
+        stream = AudioStream(content_type)
+        with self._lock:
+            self._streams[stream.id] = stream
+            while len(self._streams) > MAX_STREAMS:
+                self._streams.popitem(last=False)
+        return stream
+
+    def get_stream(self, stream_id: str) -> Optional[AudioStream]:
+        with self._lock:
+            return self._streams.get(stream_id)
+
+    def url_for(self, stream: AudioStream) -> str:
+        return f"{self.base_url}/audio/{stream.id}"
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def get_audio_server() -> AudioServer:
+    global _server
+    with _server_lock:
+        if _server is None:
+            _server = AudioServer(AUDIO_SERVER_HOST, AUDIO_SERVER_PORT)
+        return _server
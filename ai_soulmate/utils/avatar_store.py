@@ -0,0 +1,60 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Optional
+from PIL import Image
+
+AVATAR_DIR = os.environ.get(
+    "AVATAR_DIR", os.path.join(os.path.expanduser("~"), ".cache", "ai_soulmate", "avatars")
+)
+
+
+def avatar_key(model: str, prompt: str, seed: int, width: int, height: int) -> str:
+    payload = json.dumps(
+        {"model": model, "prompt": prompt, "seed": seed, "width": width, "height": height}, sort_keys=True
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class AvatarStore:
+    # Content-addressed PNG store shared by every session and kept across
+    # restarts. Generated avatars are keyed by their generation settings and
+    # uploads by their pixels, so nothing is ever overwritten in place.
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".png")
+
+    def get(self, key: str) -> Optional[str]:
+        path = self.path_for(key)
+        return path if os.path.exists(path) else None
+
+    def put(self, key: str, image: Image.Image) -> str:
+        path = self.path_for(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        image.save(tmp_path, format="PNG")
+        os.replace(tmp_path, path)
+        return path
+
+    def put_upload(self, image: Image.Image) -> str:
+        digest = hashlib.sha256()
+        digest.update(f"{image.mode}:{image.size}".encode("utf-8"))
+        digest.update(image.tobytes())
+        key = "upload-" + digest.hexdigest()
+        return self.get(key) or self.put(key, image)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_avatar_store() -> AvatarStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = AvatarStore(AVATAR_DIR)
+        return _store
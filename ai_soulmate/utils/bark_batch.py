@@ -0,0 +1,247 @@
+from typing import List, Optional
+import numpy as np
+import torch
+import torch.nn.functional as F
+import bark.generation as generation
+from bark.generation import (
+    CODEBOOK_SIZE,
+    COARSE_INFER_TOKEN,
+    COARSE_RATE_HZ,
+    COARSE_SEMANTIC_PAD_TOKEN,
+    N_COARSE_CODEBOOKS,
+    N_FINE_CODEBOOKS,
+    SEMANTIC_INFER_TOKEN,
+    SEMANTIC_PAD_TOKEN,
+    SEMANTIC_RATE_HZ,
+    SEMANTIC_VOCAB_SIZE,
+    TEXT_ENCODING_OFFSET,
+    TEXT_PAD_TOKEN,
+    _flatten_codebooks,
+    _inference_mode,
+    _load_history_prompt,
+    _normalize_whitespace,
+    _tokenize,
+    codec_decode,
+    preload_models,
+)
+
+# Batched versions of Bark's semantic, coarse and fine stages. They follow
+# bark.generation step by step, but every row of the batch is sampled in the
+# same forward pass. Shorter rows are right-padded with the pad token Bark
+# itself uses past the end of a sequence, and each row is trimmed back to its
+# own length afterwards.
+
+
+def _ensure_models():
+    if not all(k in generation.models for k in ("text", "coarse", "fine", "codec")):
+        preload_models()
+
+
+def _device(model) -> torch.device:
+    return next(model.parameters()).device
+
+
+def generate_semantic_batch(
+    texts: List[str], history: Optional[dict], temp: float = 0.7, min_eos_p: float = 0.2, max_steps: int = 768
+) -> List[np.ndarray]:
+    model_container = generation.models["text"]
+    model = model_container["model"]
+    tokenizer = model_container["tokenizer"]
+    device = _device(model)
+    batch = len(texts)
+
+    encoded = np.full((batch, 256), TEXT_PAD_TOKEN, dtype=np.int64)
+    for i, text in enumerate(texts):
+        tokens = (np.array(_tokenize(tokenizer, _normalize_whitespace(text))) + TEXT_ENCODING_OFFSET)[:256]
+        encoded[i, : len(tokens)] = tokens
+
+    if history is not None:
+        semantic_history = history["semantic_prompt"].astype(np.int64)[-256:]
+        semantic_history = np.pad(
+            semantic_history, (0, 256 - len(semantic_history)), constant_values=SEMANTIC_PAD_TOKEN, mode="constant"
+        )
+    else:
+        semantic_history = np.full(256, SEMANTIC_PAD_TOKEN, dtype=np.int64)
+
+    x = np.hstack(
+        [encoded, np.tile(semantic_history, (batch, 1)), np.full((batch, 1), SEMANTIC_INFER_TOKEN)]
+    ).astype(np.int64)
+    lengths = [max_steps] * batch
+
+    with _inference_mode():
+        x = torch.from_numpy(x).to(device)
+        done = torch.zeros(batch, dtype=torch.bool, device=device)
+        kv_cache = None
+        for n in range(max_steps):
+            x_input = x if kv_cache is None else x[:, [-1]]
+            logits, kv_cache = model(x_input, merge_context=True, use_cache=True, past_kv=kv_cache)
+            relevant_logits = torch.hstack((logits[:, 0, :SEMANTIC_VOCAB_SIZE], logits[:, 0, [SEMANTIC_PAD_TOKEN]]))
+            probs = F.softmax(relevant_logits / temp, dim=-1)
+            item_next = torch.multinomial(probs, num_samples=1)
+
+            stop = (item_next[:, 0] == SEMANTIC_VOCAB_SIZE) | (probs[:, -1] >= min_eos_p)
+            for row in torch.nonzero(stop & ~done).flatten().tolist():
+                lengths[row] = n
+            done |= stop
+            if bool(done.all()):
+                break
+
+            # finished rows keep stepping with pad tokens, which are trimmed below
+            item_next[done] = SEMANTIC_PAD_TOKEN
+            x = torch.cat((x, item_next), dim=1)
+
+        out = x.detach().cpu().numpy()[:, 256 + 256 + 1 :]
+    return [out[i, : lengths[i]] for i in range(batch)]
+
+
+def generate_coarse_batch(
+    semantics: List[np.ndarray],
+    history: Optional[dict],
+    temp: float = 0.7,
+    max_coarse_history: int = 630,
+    sliding_window_len: int = 60,
+) -> List[np.ndarray]:
+    semantic_to_coarse_ratio = COARSE_RATE_HZ / SEMANTIC_RATE_HZ * N_COARSE_CODEBOOKS
+    max_semantic_history = int(np.floor(max_coarse_history / semantic_to_coarse_ratio))
+
+    if history is not None:
+        x_semantic_history = history["semantic_prompt"]
+        x_coarse_history = _flatten_codebooks(history["coarse_prompt"], CODEBOOK_SIZE) + SEMANTIC_VOCAB_SIZE
+        n_semantic_hist_provided = np.min(
+            [
+                max_semantic_history,
+                len(x_semantic_history) - len(x_semantic_history) % 2,
+                int(np.floor(len(x_coarse_history) / semantic_to_coarse_ratio)),
+            ]
+        )
+        n_coarse_hist_provided = int(round(n_semantic_hist_provided * semantic_to_coarse_ratio))
+        x_semantic_history = x_semantic_history[-n_semantic_hist_provided:].astype(np.int32)
+        x_coarse_history = x_coarse_history[-n_coarse_hist_provided:].astype(np.int32)
+        # same time-alignment trim as bark.generation.generate_coarse
+        x_coarse_history = x_coarse_history[:-2]
+    else:
+        x_semantic_history = np.array([], dtype=np.int32)
+        x_coarse_history = np.array([], dtype=np.int32)
+
+    model = generation.models["coarse"]
+    device = _device(model)
+    batch = len(semantics)
+    row_steps = [
+        int(round(np.floor(len(s) * semantic_to_coarse_ratio / N_COARSE_CODEBOOKS) * N_COARSE_CODEBOOKS))
+        for s in semantics
+    ]
+    n_steps = max(row_steps)
+
+    base_semantic_idx = len(x_semantic_history)
+    x_semantic = np.full(
+        (batch, base_semantic_idx + max(len(s) for s in semantics)), COARSE_SEMANTIC_PAD_TOKEN, dtype=np.int32
+    )
+    x_semantic[:, :base_semantic_idx] = x_semantic_history
+    for i, semantic in enumerate(semantics):
+        x_semantic[i, base_semantic_idx : base_semantic_idx + len(semantic)] = semantic
+
+    with _inference_mode():
+        x_semantic_in = torch.from_numpy(x_semantic).to(device)
+        x_coarse_in = torch.from_numpy(np.tile(x_coarse_history, (batch, 1))).to(device)
+        infer_token = torch.full((batch, 1), COARSE_INFER_TOKEN, dtype=torch.int32, device=device)
+        n_window_steps = int(np.ceil(n_steps / sliding_window_len))
+        n_step = 0
+        for _ in range(n_window_steps):
+            semantic_idx = base_semantic_idx + int(round(n_step / semantic_to_coarse_ratio))
+            x_in = x_semantic_in[:, max(0, semantic_idx - max_semantic_history) :]
+            x_in = x_in[:, :256]
+            x_in = F.pad(x_in, (0, 256 - x_in.shape[-1]), "constant", COARSE_SEMANTIC_PAD_TOKEN)
+            x_in = torch.hstack([x_in, infer_token, x_coarse_in[:, -max_coarse_history:]])
+            kv_cache = None
+            for _ in range(sliding_window_len):
+                if n_step >= n_steps:
+                    break
+                is_major_step = n_step % N_COARSE_CODEBOOKS == 0
+                x_input = x_in if kv_cache is None else x_in[:, [-1]]
+                logits, kv_cache = model(x_input, use_cache=True, past_kv=kv_cache)
+                logit_start_idx = SEMANTIC_VOCAB_SIZE + (1 - int(is_major_step)) * CODEBOOK_SIZE
+                logit_end_idx = SEMANTIC_VOCAB_SIZE + (2 - int(is_major_step)) * CODEBOOK_SIZE
+                probs = F.softmax(logits[:, 0, logit_start_idx:logit_end_idx] / temp, dim=-1)
+                item_next = torch.multinomial(probs, num_samples=1).to(torch.int32) + logit_start_idx
+                x_coarse_in = torch.cat((x_coarse_in, item_next), dim=1)
+                x_in = torch.cat((x_in, item_next), dim=1)
+                n_step += 1
+
+        generated = x_coarse_in.detach().cpu().numpy()[:, len(x_coarse_history) :]
+
+    coarse = []
+    for i, steps in enumerate(row_steps):
+        arr = generated[i, :steps].reshape(-1, N_COARSE_CODEBOOKS).T - SEMANTIC_VOCAB_SIZE
+        for n in range(1, N_COARSE_CODEBOOKS):
+            arr[n, :] -= n * CODEBOOK_SIZE
+        coarse.append(arr)
+    return coarse
+
+
+def generate_fine_batch(coarses: List[np.ndarray], history: Optional[dict], temp: float = 0.5) -> List[np.ndarray]:
+    model = generation.models["fine"]
+    device = _device(model)
+    batch = len(coarses)
+    n_coarse = coarses[0].shape[0]
+    lengths = [c.shape[1] for c in coarses]
+
+    if history is not None:
+        x_fine_history = history["fine_prompt"][:, -512:].astype(np.int32)
+        n_history = x_fine_history.shape[1]
+    else:
+        x_fine_history = None
+        n_history = 0
+
+    # the fine model is non-causal, so every row is padded to at least one full window
+    total = max(n_history + max(lengths), 1024)
+    in_arr = np.full((batch, N_FINE_CODEBOOKS, total), CODEBOOK_SIZE, dtype=np.int32)
+    if x_fine_history is not None:
+        in_arr[:, :, :n_history] = x_fine_history
+    for i, coarse in enumerate(coarses):
+        in_arr[i, :n_coarse, n_history : n_history + lengths[i]] = coarse
+
+    n_loops = max(0, int(np.ceil((max(lengths) - (1024 - n_history)) / 512))) + 1
+    with _inference_mode():
+        in_arr = torch.tensor(in_arr.transpose(0, 2, 1)).to(device)
+        for n in range(n_loops):
+            start_idx = min(n * 512, in_arr.shape[1] - 1024)
+            start_fill_idx = min(n_history + n * 512, in_arr.shape[1] - 512)
+            rel_start_fill_idx = start_fill_idx - start_idx
+            # a view into in_arr, so predictions land in place
+            in_buffer = in_arr[:, start_idx : start_idx + 1024, :]
+            for nn in range(n_coarse, N_FINE_CODEBOOKS):
+                logits = model(nn, in_buffer)
+                probs = F.softmax(logits[:, rel_start_fill_idx:1024, :CODEBOOK_SIZE] / temp, dim=-1)
+                codebook_preds = torch.multinomial(probs.reshape(-1, CODEBOOK_SIZE), num_samples=1)
+                in_buffer[:, rel_start_fill_idx:, nn] = codebook_preds.reshape(batch, -1).to(torch.int32)
+        generated = in_arr.detach().cpu().numpy().transpose(0, 2, 1)
+
+    return [generated[i, :, n_history : n_history + lengths[i]] for i in range(batch)]
+
+
+def generate_batch(
+    texts: List[str],
+    voice_id: Optional[str],
+    temp: float = 0.7,
+    min_eos_p: float = 0.2,
+    waveform_temp: float = 0.7,
+    max_coarse_history: int = 630,
+    use_fine: bool = True,
+) -> List[np.ndarray]:
+    _ensure_models()
+    history = _load_history_prompt(voice_id) if voice_id is not None else None
+
+    semantics = generate_semantic_batch(texts, history, temp=temp, min_eos_p=min_eos_p)
+    waveforms = [np.zeros(0, dtype=np.float32) for _ in texts]
+    rows = [i for i, semantic in enumerate(semantics) if len(semantic) > 1]
+    if not rows:
+        return waveforms
+
+    coarses = generate_coarse_batch(
+        [semantics[i] for i in rows], history, temp=waveform_temp, max_coarse_history=max_coarse_history
+    )
+    # without the fine stage the two coarse codebooks are decoded directly
+    codes = generate_fine_batch(coarses, history, temp=0.5) if use_fine else coarses
+    for i, code in zip(rows, codes):
+        waveforms[i] = codec_decode(code)
+    return waveforms
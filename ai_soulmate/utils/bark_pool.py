@@ -0,0 +1,63 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, wait
+from typing import Optional, Tuple
+import numpy as np
+
+# worker processes for Bark synthesis; 0 keeps synthesis in the app process
+BARK_WORKERS = int(os.environ.get("BARK_WORKERS", "0"))
+# torch threads per worker; 0 splits the cores evenly between workers
+BARK_THREADS_PER_WORKER = int(os.environ.get("BARK_THREADS_PER_WORKER", "0"))
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _init_worker(threads: int):
+    import torch
+    from utils.bark_tiers import preload_bark
+
+    # batch-1 sampling barely benefits from intra-op threads, so each worker
+    # gets a share of the cores and the pool works on several chunks at once
+    torch.set_num_threads(threads)
+    preload_bark()
+
+
+def _ready():
+    pass
+
+
+def synthesize_in_worker(
+    sentence: str, voice_id: str, tier: str, temp: float, min_eos_p: float
+) -> Tuple[np.ndarray, Optional[float]]:
+    from utils.bark_tiers import timed_synthesis
+
+    # the time spent here, without queueing, feeds the parent's real-time factor;
+    # None for the worker's first run of a tier
+    return timed_synthesis(sentence, voice_id, tier, temp, min_eos_p)
+
+
+def create_bark_pool(workers: int, threads_per_worker: int = 0) -> ProcessPoolExecutor:
+    threads = threads_per_worker or max(1, (os.cpu_count() or 1) // workers)
+    # spawn, so workers never inherit a half-initialized torch from the app
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(threads,),
+    )
+
+
+def get_bark_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = create_bark_pool(BARK_WORKERS, BARK_THREADS_PER_WORKER)
+        return _pool
+
+
+def warm_up_pool():
+    # one no-op per worker starts every process, and with it every initializer
+    pool = get_bark_pool()
+    wait([pool.submit(_ready) for _ in range(BARK_WORKERS)])
@@ -0,0 +1,380 @@
+from typing import List, Optional
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+import numpy as np
+import streamlit as st
+from bark import SAMPLE_RATE
+import sounddevice as sd
+from utils.tts_cache import cache_key, get_tts_cache
+from utils import service_client
+from utils.bark_batch import generate_batch
+from utils.bark_pool import BARK_WORKERS, get_bark_pool, synthesize_in_worker
+from utils.bark_tiers import (
+    BARK_LATENCY_BUDGET,
+    BARK_TIER,
+    TIER_OPTIONS,
+    TIERS,
+    choose_tier,
+    ensure_bark_loaded,
+    first_run,
+    record_rtf,
+    synthesize_tier,
+    tier_cache_params,
+    tier_stats,
+    warm_up_bark,
+)
+from utils.telemetry import Turn
+
+# Bark speech backend: synthesizes on this machine and plays on its sound device.
+
+GEN_TEMP = 0.6
+SILENCE_SECONDS = 0.25
+MAX_QUEUED_CHUNKS = 2
+# chunks already waiting are synthesized together, up to this many per forward pass
+BARK_BATCH_SIZE = int(os.environ.get("BARK_BATCH_SIZE", "4"))
+
+
+def split_text(text: str, max_length: int = 200) -> List[str]:
+    words = text.split()
+    chunks = []
+    chunk = []
+
+    for word in words:
+        if len(" ".join(chunk + [word])) > max_length:
+            chunks.append(" ".join(chunk))
+            chunk = [word]
+        else:
+            chunk.append(word)
+
+    if chunk:
+        chunks.append(" ".join(chunk))
+
+    return chunks
+
+
+def synthesize_chunk(sentence: str, voice_id: str, tier: str = "quality") -> np.ndarray:
+    tier = choose_tier(tier)
+    cache = get_tts_cache()
+    key = cache_key("bark", voice_id, sentence, temp=GEN_TEMP, min_eos_p=0.05, **tier_cache_params(tier))
+    audio_array = cache.get_array(key)
+    if audio_array is not None:
+        return audio_array
+
+    audio_array = synthesize_tier(sentence, voice_id, tier, GEN_TEMP, 0.05)
+    cache.put_array(key, audio_array)
+    return audio_array
+
+
+def submit_chunk(sentence: str, voice_id: str, tier: str = "quality") -> Future:
+    # synthesizes one chunk on the Bark process pool; cache hits resolve at once
+    tier = choose_tier(tier)
+    cache = get_tts_cache()
+    key = cache_key("bark", voice_id, sentence, temp=GEN_TEMP, min_eos_p=0.05, **tier_cache_params(tier))
+    future = Future()
+    audio_array = cache.get_array(key)
+    if audio_array is not None:
+        future.set_result(audio_array)
+        return future
+
+    def store(done: Future):
+        if done.exception() is not None:
+            future.set_exception(done.exception())
+            return
+        audio_array, seconds = done.result()
+        record_rtf(tier, seconds, len(audio_array) / SAMPLE_RATE)
+        cache.put_array(key, audio_array)
+        future.set_result(audio_array)
+
+    get_bark_pool().submit(synthesize_in_worker, sentence, voice_id, tier, GEN_TEMP, 0.05).add_done_callback(store)
+    return future
+
+
+def synthesize_chunks(sentences: List[str], voice_id: str, tier: str = "quality") -> List[np.ndarray]:
+    tier = choose_tier(tier)
+    if BARK_WORKERS:
+        return [future.result() for future in [submit_chunk(s, voice_id, tier) for s in sentences]]
+    if len(sentences) == 1:
+        return [synthesize_chunk(sentences[0], voice_id, tier)]
+
+    cache = get_tts_cache()
+    keys = [
+        cache_key("bark", voice_id, s, temp=GEN_TEMP, min_eos_p=0.05, **tier_cache_params(tier)) for s in sentences
+    ]
+    audio_arrays = [cache.get_array(key) for key in keys]
+    missing = [i for i, audio_array in enumerate(audio_arrays) if audio_array is None]
+    if missing:
+        ensure_bark_loaded()
+        cold = first_run((tier, "batch"))
+        start = time.perf_counter()
+        generated = generate_batch(
+            [sentences[i] for i in missing], voice_id, temp=GEN_TEMP, min_eos_p=0.05, **TIERS[tier]
+        )
+        seconds = None if cold else time.perf_counter() - start
+        record_rtf(tier, seconds, sum(len(a) for a in generated) / SAMPLE_RATE)
+        for i, audio_array in zip(missing, generated):
+            cache.put_array(keys[i], audio_array)
+            audio_arrays[i] = audio_array
+    return audio_arrays
+
+
+class StreamingPlayer:
+    # Plays waveforms from a bounded queue as soon as they arrive. The silence
+    # between chunks is written straight into the output buffer, so nothing is
+    # ever concatenated.
+
+    def __init__(
+        self,
+        sample_rate: int,
+        gap_seconds: float = SILENCE_SECONDS,
+        max_queued: int = MAX_QUEUED_CHUNKS,
+        turn: Optional[Turn] = None,
+    ):
+        self.sample_rate = sample_rate
+        self.turn = turn
+        self.chunks = queue.Queue(maxsize=max_queued)
+        self.gap_frames = int(gap_seconds * sample_rate)
+        self.error = None
+        self._current = None
+        self._position = 0
+        self._gap_left = 0
+        self._finished = threading.Event()
+        # set when playback has failed, so nothing waits for room in the queue any more
+        self._dead = threading.Event()
+
+    def put(self, audio_array: np.ndarray):
+        self._put(np.asarray(audio_array, dtype=np.float32))
+        if self._dead.is_set():
+            # stops the synthesis worker; there is nothing left to play on
+            raise self.error
+
+    def close(self):
+        self._put(None)
+
+    def _put(self, item):
+        while not self._dead.is_set():
+            try:
+                self.chunks.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def _callback(self, outdata, frames, time, status):
+        out = outdata[:, 0]
+        written = 0
+        while written < frames:
+            if self._current is None:
+                if self._gap_left > 0:
+                    n = min(self._gap_left, frames - written)
+                    out[written:written + n] = 0
+                    self._gap_left -= n
+                    written += n
+                    continue
+                try:
+                    chunk = self.chunks.get_nowait()
+                except queue.Empty:
+                    # next chunk is still being synthesized, keep the stream alive
+                    out[written:] = 0
+                    return
+                if chunk is None:
+                    out[written:] = 0
+                    raise sd.CallbackStop
+                self._current = chunk
+                self._position = 0
+                if self.turn is not None:
+                    self.turn.mark("first_audio")
+
+            n = min(len(self._current) - self._position, frames - written)
+            out[written:written + n] = self._current[self._position:self._position + n]
+            self._position += n
+            written += n
+            if self._position >= len(self._current):
+                self._current = None
+                self._gap_left = self.gap_frames
+
+    def play(self):
+        try:
+            with sd.OutputStream(
+                samplerate=self.sample_rate,
+                channels=1,
+                dtype="float32",
+                callback=self._callback,
+                finished_callback=self._finished.set,
+            ):
+                self._finished.wait()
+        except Exception as e:
+            # e.g. no output device; finish() raises it once the worker has stopped
+            self.error = e
+            self._dead.set()
+            return
+        if self.turn is not None and self.turn.at("first_audio") is not None:
+            self.turn.add("playback", time.perf_counter() - self.turn.at("first_audio"))
+
+
+def _synthesize_worker(requests: queue.Queue, voice_id: str, player: StreamingPlayer, batch_size: int, tier: str):
+    # each request is the list of chunks from one say() call; whatever is
+    # already waiting is merged and synthesized batch_size chunks at a time
+    try:
+        finished = False
+        while not finished:
+            pending = [requests.get()]
+            while pending[-1] is not None:
+                try:
+                    pending.append(requests.get_nowait())
+                except queue.Empty:
+                    break
+            finished = pending[-1] is None
+            chunks = [chunk for request in pending if request is not None for chunk in request]
+            for start in range(0, len(chunks), batch_size):
+                batch = chunks[start:start + batch_size]
+                started = time.perf_counter()
+                if service_client.service_enabled():
+                    # read the whole response here, so the request is inside the timed span
+                    audio_arrays = list(service_client.synthesize(batch, voice_id, tier))
+                else:
+                    audio_arrays = synthesize_chunks(batch, voice_id, tier)
+                if player.turn is not None:
+                    player.turn.add("tts", time.perf_counter() - started)
+                for audio_array in audio_arrays:
+                    player.put(audio_array)
+    except Exception as e:
+        player.error = e
+    finally:
+        player.close()
+
+
+def _parallel_synthesize_worker(requests: queue.Queue, voice_id: str, player: StreamingPlayer, tier: str):
+    # every chunk goes to the process pool as soon as it is said, and finished
+    # waveforms are handed to the player strictly in the order they were said
+    try:
+        pending = deque()
+        finished = False
+        while not finished or pending:
+            if not finished:
+                try:
+                    request = requests.get(block=not pending)
+                except queue.Empty:
+                    request = []
+                if request is None:
+                    finished = True
+                else:
+                    for chunk in request:
+                        future = submit_chunk(chunk, voice_id, tier)
+                        if player.turn is not None:
+                            # time until the chunk is ready, including its wait for a free worker
+                            submitted = time.perf_counter()
+                            future.add_done_callback(
+                                lambda _, t=submitted: player.turn.add("tts", time.perf_counter() - t)
+                            )
+                        pending.append(future)
+            if pending:
+                try:
+                    audio_array = pending[0].result(timeout=0.05)
+                except FutureTimeout:
+                    continue
+                pending.popleft()
+                player.put(audio_array)
+    except Exception as e:
+        player.error = e
+    finally:
+        player.close()
+
+
+class SpeechSession:
+    # Speaks sentences as they are handed over: a worker synthesizes them in
+    # order while the player streams finished waveforms to the sound device.
+
+    def __init__(
+        self,
+        voice_id: str = "v2/en_speaker_9",
+        batch_size: int = BARK_BATCH_SIZE,
+        tier: str = BARK_TIER,
+        turn: Optional[Turn] = None,
+    ):
+        self.requests = queue.Queue()
+        self.player = StreamingPlayer(SAMPLE_RATE, turn=turn)
+        if BARK_WORKERS and not service_client.service_enabled():
+            target, args = _parallel_synthesize_worker, (self.requests, voice_id, self.player, tier)
+        else:
+            target, args = _synthesize_worker, (self.requests, voice_id, self.player, batch_size, tier)
+        self._worker = threading.Thread(target=target, args=args, daemon=True)
+        self._playback = threading.Thread(target=self.player.play, daemon=True)
+        self._worker.start()
+        self._playback.start()
+
+    def say(self, text: str):
+        chunks = split_text(text)
+        if chunks:
+            self.requests.put(chunks)
+
+    def render(self):
+        # playback is on this machine's sound device, so there is nothing to put on the page
+        pass
+
+    def finish(self):
+        self.requests.put(None)
+        self._worker.join()
+        self._playback.join()
+        if self.player.error is not None:
+            raise self.player.error
+
+
+def generate_and_play_response(
+    response_text: str,
+    voice_id: str = "v2/en_speaker_9",
+    pipelined: bool = True,
+    batch_size: int = BARK_BATCH_SIZE,
+    tier: str = BARK_TIER,
+):
+    text_chunks = split_text(response_text)
+
+    if not pipelined:
+        silence = np.zeros(int(SILENCE_SECONDS * SAMPLE_RATE))
+        pieces = []
+        for sentence in text_chunks:
+            pieces.append(synthesize_chunk(sentence, voice_id, tier))
+            pieces.append(silence.copy())
+
+        combined_audio = np.concatenate(pieces)
+        play_audio(SAMPLE_RATE, combined_audio)
+        return
+
+    speech = SpeechSession(voice_id, batch_size=batch_size, tier=tier)
+    speech.say(response_text)
+    speech.finish()
+
+
+def play_audio(sample_rate, audio_array):
+    sd.play(audio_array, sample_rate)
+    sd.wait()
+
+
+def warm_up():
+    warm_up_bark()
+
+
+def sidebar() -> dict:
+    st.sidebar.selectbox(
+        "Speech Quality",
+        TIER_OPTIONS,
+        index=TIER_OPTIONS.index(BARK_TIER),
+        key="bark_tier",
+        help=f"'auto' picks the best tier that synthesizes faster than {BARK_LATENCY_BUDGET:g}x real time",
+    )
+    st.sidebar.number_input(
+        "Speech Batch Size",
+        min_value=1,
+        max_value=8,
+        value=BARK_BATCH_SIZE,
+        key="bark_batch_size",
+        help="Sentences that are waiting are synthesized together, up to this many at once",
+    )
+    rtf = tier_stats()
+    if rtf:
+        st.sidebar.caption(
+            "Speech synthesis: " + ", ".join(f"{tier} {value:.2f}x real time" for tier, value in rtf.items())
+        )
+    return {"tier": st.session_state.bark_tier, "batch_size": st.session_state.bark_batch_size}
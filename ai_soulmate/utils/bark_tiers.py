@@ -0,0 +1,143 @@
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+import numpy as np
+import bark.generation as generation
+from bark import SAMPLE_RATE, preload_models
+from bark.generation import codec_decode, generate_coarse, generate_fine, generate_text_semantic
+from utils.bark_pool import BARK_WORKERS, warm_up_pool
+from utils.service_client import service_enabled
+
+# default speech tier for new sessions, and the real-time factor "auto" must stay under
+BARK_TIER = os.environ.get("BARK_TIER", "quality")
+BARK_LATENCY_BUDGET = float(os.environ.get("BARK_LATENCY_BUDGET", "1.0"))
+# the small checkpoints replace the full ones for the whole process
+BARK_SMALL_MODELS = os.environ.get("BARK_SMALL_MODELS", "false").lower() == "true"
+BARK_PRELOAD = os.environ.get("BARK_PRELOAD", "true").lower() == "true"
+# seconds after which a tier's measured speed is stale, so "auto" tries a slow tier again
+BARK_RTF_MAX_AGE = float(os.environ.get("BARK_RTF_MAX_AGE", "120"))
+
+# from best to fastest; a shorter coarse history shrinks the context of every
+# coarse step, and "fast" decodes the two coarse codebooks without the fine stage
+TIERS = {
+    "quality": {"max_coarse_history": 630, "use_fine": True},
+    "balanced": {"max_coarse_history": 210, "use_fine": True},
+    "fast": {"max_coarse_history": 210, "use_fine": False},
+}
+TIER_OPTIONS = ["auto", *TIERS]
+
+_rtf = {}
+_rtf_at = {}
+_probed_at = {}
+_rtf_lock = threading.Lock()
+# what this process has synthesized at least once; the first run of each is warm-up
+_warm = set()
+_preload_thread = None
+_preload_lock = threading.Lock()
+
+
+def preload_bark():
+    preload_models(
+        text_use_small=BARK_SMALL_MODELS,
+        coarse_use_small=BARK_SMALL_MODELS,
+        fine_use_small=BARK_SMALL_MODELS,
+    )
+
+
+def ensure_bark_loaded():
+    # Bark loads missing models inside the first generate call, which must not be timed
+    if not all(k in generation.models for k in ("text", "coarse", "fine", "codec")):
+        preload_bark()
+
+
+def first_run(key) -> bool:
+    with _rtf_lock:
+        if key in _warm:
+            return False
+        _warm.add(key)
+        return True
+
+
+def warm_up_bark():
+    # loads Bark in the background so the first reply does not wait for it
+    global _preload_thread
+    with _preload_lock:
+        if not BARK_PRELOAD or service_enabled() or _preload_thread is not None:
+            return
+        target = warm_up_pool if BARK_WORKERS else preload_bark
+        _preload_thread = threading.Thread(target=target, name="bark-preload", daemon=True)
+        _preload_thread.start()
+
+
+def tier_cache_params(tier: str) -> Dict:
+    # the quality tier with full models keeps the cache keys it always had
+    params = {} if tier == "quality" else {"tier": tier}
+    if BARK_SMALL_MODELS:
+        params["small"] = True
+    return params
+
+
+def choose_tier(tier: str) -> str:
+    if tier != "auto":
+        return tier
+    # the best tier that keeps up with the budget; untried tiers get one chance,
+    # and a tier that fell behind gets one more once its measurement is stale
+    now = time.monotonic()
+    with _rtf_lock:
+        for name in TIERS:
+            rtf = _rtf.get(name)
+            if rtf is None or rtf <= BARK_LATENCY_BUDGET:
+                return name
+            if now - max(_rtf_at[name], _probed_at.get(name, 0.0)) > BARK_RTF_MAX_AGE:
+                _probed_at[name] = now
+                return name
+    return "fast"
+
+
+def record_rtf(tier: str, seconds: Optional[float], audio_seconds: float):
+    # seconds is None for warm-up runs, which say nothing about the steady speed
+    if seconds is None or audio_seconds <= 0:
+        return
+    rtf = seconds / audio_seconds
+    now = time.monotonic()
+    with _rtf_lock:
+        previous = _rtf.get(tier)
+        stale = previous is None or now - _rtf_at[tier] > BARK_RTF_MAX_AGE
+        _rtf[tier] = rtf if stale else 0.7 * previous + 0.3 * rtf
+        _rtf_at[tier] = now
+
+
+def tier_stats() -> Dict[str, float]:
+    with _rtf_lock:
+        return dict(_rtf)
+
+
+def synthesize_tier(sentence: str, voice_id: str, tier: str, temp: float, min_eos_p: float) -> np.ndarray:
+    audio_array, seconds = timed_synthesis(sentence, voice_id, tier, temp, min_eos_p)
+    record_rtf(tier, seconds, len(audio_array) / SAMPLE_RATE)
+    return audio_array
+
+
+def timed_synthesis(
+    sentence: str, voice_id: str, tier: str, temp: float, min_eos_p: float
+) -> Tuple[np.ndarray, Optional[float]]:
+    # the synthesis time, or None for this process's first run of the tier
+    settings = TIERS[tier]
+    ensure_bark_loaded()
+    cold = first_run(tier)
+    start = time.perf_counter()
+    semantic_tokens = generate_text_semantic(
+        sentence, history_prompt=voice_id, temp=temp, min_eos_p=min_eos_p, silent=True
+    )
+    codes = generate_coarse(
+        semantic_tokens,
+        history_prompt=voice_id,
+        temp=0.7,
+        silent=True,
+        max_coarse_history=settings["max_coarse_history"],
+    )
+    if settings["use_fine"]:
+        codes = generate_fine(codes, history_prompt=voice_id, temp=0.5)
+    audio_array = codec_decode(codes)
+    return audio_array, None if cold else time.perf_counter() - start
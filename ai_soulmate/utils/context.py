@@ -0,0 +1,109 @@
+import hashlib
+import weakref
+from collections import OrderedDict
+from typing import Callable, List, Optional
+
+# rough cost of the chat template around each message (role header, separators)
+MESSAGE_OVERHEAD = 8
+# share of the budget the history is cut down to once it no longer fits
+TRIM_TO = 0.75
+
+
+class ContextWindow:
+    # Chooses the messages sent to the model for one turn. System messages are
+    # always kept, then the newest turns are added until the token budget is
+    # spent; older turns are dropped. Token counts are cached per message so
+    # each message is tokenized only once.
+    #
+    # Once a session's history is over budget it is cut down to TRIM_TO of the
+    # budget, and later turns keep starting from the same message until the
+    # budget is spent again. The prompt prefix then stays the same for several
+    # turns, so the prefix cache can reuse it instead of evaluating the whole
+    # history after every cut.
+
+    def __init__(self, tokenize: Callable[[str], List[int]], cache_size: int = 4096):
+        self.tokenize = tokenize
+        self.cache_size = cache_size
+        self._counts = OrderedDict()
+        # session -> key of the first message its prompt was last cut to
+        self._starts = OrderedDict()
+
+    @staticmethod
+    def _key(message: dict) -> bytes:
+        return hashlib.sha1(f"{message['role']}\0{message['content']}".encode("utf-8")).digest()
+
+    def count(self, message: dict) -> int:
+        key = self._key(message)
+        n = self._counts.get(key)
+        if n is None:
+            n = len(self.tokenize(message["content"])) + MESSAGE_OVERHEAD
+            self._counts[key] = n
+            if len(self._counts) > self.cache_size:
+                self._counts.popitem(last=False)
+        else:
+            self._counts.move_to_end(key)
+        return n
+
+    def fit(self, messages: List[dict], budget: int, session: Optional[str] = None):
+        system = [m for m in messages if m["role"] == "system"]
+        turns = [m for m in messages if m["role"] != "system"]
+        used = sum(self.count(m) for m in system)
+        counts = [self.count(m) for m in turns]
+
+        start = self._start(session, turns)
+        if start is None or used + sum(counts[start:]) > budget:
+            # without a session to remember the cut, trim just enough to fit
+            limit = budget if session is None or used + sum(counts) <= budget else int(budget * TRIM_TO)
+            start = len(turns)
+            total = used
+            # the newest message is always sent, even if it alone is over budget
+            while start > 0 and (start == len(turns) or total + counts[start - 1] <= limit):
+                start -= 1
+                total += counts[start]
+            if session is not None:
+                self._remember(session, turns[start] if start > 0 else None)
+        kept = turns[start:]
+        used += sum(counts[start:])
+
+        full = used + sum(counts[:start])
+        stats = {
+            "prompt_tokens": used,
+            "full_tokens": full,
+            "saved_tokens": full - used,
+            "dropped_messages": len(turns) - len(kept),
+            "budget": budget,
+        }
+        return system + kept, stats
+
+    def _start(self, session: Optional[str], turns: List[dict]) -> Optional[int]:
+        # index of the message the session's prompt was last cut to; 0 if it was never cut
+        if session is None or session not in self._starts:
+            return None
+        self._starts.move_to_end(session)
+        key = self._starts[session]
+        if key is None:
+            return 0
+        return next((i for i, m in enumerate(turns) if self._key(m) == key), None)
+
+    def _remember(self, session: str, first: Optional[dict]):
+        self._starts[session] = None if first is None else self._key(first)
+        self._starts.move_to_end(session)
+        if len(self._starts) > self.cache_size:
+            self._starts.popitem(last=False)
+
+
+_windows = weakref.WeakKeyDictionary()
+
+
+def get_context_window(nexa_model) -> ContextWindow:
+    window = _windows.get(nexa_model)
+    if window is None:
+        llm = nexa_model.model
+        window = _windows[nexa_model] = ContextWindow(
+            lambda text: llm.tokenize(text.encode("utf-8"), add_bos=False)
+        )
+    return window
+
+
+def default_context_budget(nexa_model) -> int:
+    return max(256, nexa_model.model.n_ctx() - nexa_model.params["max_new_tokens"])
@@ -0,0 +1,84 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import List
+
+CONVERSATION_DB = os.environ.get(
+    "CONVERSATION_DB", os.path.join(os.path.expanduser("~"), ".cache", "ai_soulmate", "conversations.db")
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT NOT NULL,
+    persona TEXT NOT NULL,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    visible INTEGER NOT NULL DEFAULT 1,
+    created REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS messages_conversation ON messages (user_id, persona, id);
+CREATE INDEX IF NOT EXISTS messages_visible ON messages (user_id, persona, visible, id);
+"""
+
+
+class ConversationStore:
+    # Chat history shared by every session and kept across restarts, one
+    # conversation per user and persona. Messages are only ever appended, one
+    # transaction per turn, and read back newest first through an index, so
+    # reading the last page costs the same however long the conversation is.
+    # WAL mode lets sessions read while another one is writing.
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def append(self, user_id: str, persona: str, messages: List[dict]):
+        now = time.time()
+        rows = [
+            (user_id, persona, m["role"], m["content"], int(m.get("visible", True)), now) for m in messages
+        ]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT INTO messages (user_id, persona, role, content, visible, created) VALUES (?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def recent(self, user_id: str, persona: str, limit: int, visible_only: bool = False) -> List[dict]:
+        # the newest `limit` messages, oldest first
+        query = "SELECT role, content, visible FROM messages WHERE user_id = ? AND persona = ?"
+        if visible_only:
+            query += " AND visible = 1"
+        query += " ORDER BY id DESC LIMIT ?"
+        with self._lock:
+            rows = self._conn.execute(query, (user_id, persona, limit)).fetchall()
+        messages = []
+        for role, content, visible in reversed(rows):
+            message = {"role": role, "content": content}
+            if not visible:
+                message["visible"] = False
+            messages.append(message)
+        return messages
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_conversation_store() -> ConversationStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ConversationStore(CONVERSATION_DB)
+        return _store
@@ -1,9 +1,9 @@
 import streamlit as st
 from PIL import Image
 from streamlit_modal import Modal
-from utils.gen_response import generate_and_play_response
-import os
-import shutil
+from utils.avatar_store import get_avatar_store
+from utils.gen_avatar import generate_avatar_variants
+from utils.tts_backends import get_tts_backend
 
 
 def initialize_temp_customization():
@@ -12,7 +12,7 @@ def initialize_temp_customization():
             "name": st.session_state.get("soulmate_name", "Claudia"),
             "gender": st.session_state.get("soulmate_gender", "Female"),
             "custom_instructions": st.session_state.get("custom_instructions", ""),
-            "voice": st.session_state.get("voice", "v2/en_speaker_9"),
+            "voice": st.session_state.get("voice", get_tts_backend(st.session_state.get("tts_backend")).default_voice),
         }
 
 
@@ -20,23 +20,37 @@ def customize_avatar():
     uploaded_file = st.file_uploader("Choose an image...", type=["jpg", "jpeg", "png"])
     if uploaded_file is not None:
         image = Image.open(uploaded_file)
-        uploaded_avatar_path = "uploaded_avatar.png"
-        image.save(uploaded_avatar_path)
-        st.session_state.uploaded_avatar = uploaded_avatar_path
+        st.session_state.uploaded_avatar = get_avatar_store().put_upload(image)
         st.image(image, caption="Preview", use_column_width=False)
 
 
-def customize_voice():
-    voices = {
-        "Female voice 1": "v2/en_speaker_6",
-        "Female voice 2": "v2/en_speaker_9",
-        "Male voice 1": "v2/en_speaker_7",
-        "Male voice 2": "v2/en_speaker_8",
-    }
+def choose_generated_avatar():
+    temp = st.session_state.temp_customization
+    if st.button("Generate avatars for this character"):
+        with st.spinner("Drawing a few options for you..."):
+            try:
+                st.session_state.avatar_variants = generate_avatar_variants(
+                    temp["name"], temp["gender"], temp["custom_instructions"]
+                )
+            except Exception as e:
+                st.error(f"Error generating AI avatar: {str(e)}")
+
+    variants = st.session_state.get("avatar_variants", [])
+    if variants:
+        columns = st.columns(len(variants))
+        for i, (column, path) in enumerate(zip(columns, variants)):
+            with column:
+                st.image(path, use_column_width=True)
+                if st.button("Use this", key=f"use_avatar_{i}"):
+                    st.session_state.uploaded_avatar = path
+
+
+def customize_voice(voices):
+    current = st.session_state.temp_customization["voice"]
     selected_voice = st.selectbox(
         "Choose a voice:",
         list(voices.keys()),
-        index=list(voices.values()).index(st.session_state.temp_customization["voice"]),
+        index=list(voices.values()).index(current) if current in voices.values() else 0,
         key="temp_voice",
     )
     return voices[selected_voice]
@@ -47,6 +61,7 @@ def customization_form():
 
     st.subheader("1. Change Avatar")
     customize_avatar()
+    choose_generated_avatar()
     st.markdown("<br>", unsafe_allow_html=True)
 
     st.subheader("2. Customize Character")
@@ -68,9 +83,12 @@ def customization_form():
     )
     st.markdown("<br>", unsafe_allow_html=True)
 
-    st.subheader("3. Choose a Voice")
-    st.session_state.temp_customization["voice"] = customize_voice()
-    st.markdown("<br>", unsafe_allow_html=True)
+    # the voices on offer are those of the speech backend picked in the sidebar
+    voices = get_tts_backend(st.session_state.get("tts_backend")).voices
+    if voices:
+        st.subheader("3. Choose a Voice")
+        st.session_state.temp_customization["voice"] = customize_voice(voices)
+        st.markdown("<br>", unsafe_allow_html=True)
 
     # CSS to center the buttons
     st.markdown(
@@ -100,11 +118,10 @@ def customization_form():
 
 def close_modal():
     st.session_state.modal_open = False
+    st.session_state.pop("avatar_variants", None)
     if "temp_customization" in st.session_state:
         del st.session_state.temp_customization
     if "uploaded_avatar" in st.session_state:
-        if os.path.exists(st.session_state.uploaded_avatar):
-            os.remove(st.session_state.uploaded_avatar)
         del st.session_state.uploaded_avatar
     st.rerun()
 
@@ -112,10 +129,7 @@ def close_modal():
 def apply_changes():
     # update avatar:
     if "uploaded_avatar" in st.session_state:
-        permanent_avatar_path = "ai_avatar.png"
-        shutil.copy(st.session_state.uploaded_avatar, permanent_avatar_path)
-        st.session_state.ai_avatar = permanent_avatar_path
-        os.remove(st.session_state.uploaded_avatar)
+        st.session_state.ai_avatar = st.session_state.uploaded_avatar
         del st.session_state.uploaded_avatar
 
     # update other customization options:
@@ -133,11 +147,14 @@ def apply_changes():
     Start by introducing yourself briefly. You will respond in a concise way.
     """
     st.session_state.messages = [{"role": "system", "content": new_prompt.strip()}]
+    # reload the stored history of this persona under the new prompt
+    st.session_state.pop("conversation", None)
 
     # set flag to indicate customization was applied:
     st.session_state.customization_applied = True
     # clean up temporary customization data:
     del st.session_state.temp_customization
+    st.session_state.pop("avatar_variants", None)
 
     st.session_state.modal_open = False
     
@@ -0,0 +1,114 @@
+import streamlit as st
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+from nexa.gguf import NexaImageInference
+from utils.avatar_store import avatar_key, get_avatar_store
+
+AVATAR_MODEL = "lcm-dreamshaper"
+DEFAULT_PROMPT = "A girlfriend with long black hair"
+PLACEHOLDER_AVATAR = "./nexalogo.png"
+AVATAR_SEED = 0
+AVATAR_SIZE = 512
+AVATAR_VARIANTS = 4
+# a failed generation is kept this long, so its error is shown, before it is tried again
+AVATAR_RETRY_SECONDS = 60
+
+# one generation at a time for the whole process; jobs are keyed like the store
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="avatar")
+_jobs = {}
+_jobs_lock = threading.Lock()
+_image_model = None
+
+
+def get_image_model() -> NexaImageInference:
+    # only ever called from the avatar executor, so no lock is needed
+    global _image_model
+    if _image_model is None:
+        _image_model = NexaImageInference(model_path=AVATAR_MODEL, local_path=None)
+    return _image_model
+
+
+def persona_prompt(name: str, gender: str, custom_instructions: str = "") -> str:
+    partner = "girlfriend" if gender == "Female" else "boyfriend"
+    prompt = f"Portrait of {name}, a {partner}"
+    if custom_instructions.strip():
+        prompt += f", {' '.join(custom_instructions.split())[:200]}"
+    return prompt
+
+
+def _generate(keys: List[str], prompt: str, seed: int, width: int, height: int) -> List[str]:
+    image_model = get_image_model()
+
+    # stable-diffusion.cpp gives image i of a batch the seed `seed + i`, so each
+    # variant is stored under the same key a single generation would use
+    images = image_model.model.txt_to_img(
+        prompt=prompt,
+        cfg_scale=image_model.params["guidance_scale"],
+        width=width,
+        height=height,
+        sample_steps=image_model.params["num_inference_steps"],
+        seed=seed,
+        batch_count=len(keys),
+    )
+
+    if not images:
+        raise RuntimeError("No image was generated.")
+    store = get_avatar_store()
+    return [store.put(key, image) for key, image in zip(keys, images)]
+
+
+def _mark_finished(job):
+    job.finished_at = time.monotonic()
+
+
+def _failed_for(job) -> Optional[float]:
+    # seconds since the job failed, None while it is pending or if it succeeded
+    if not job.done() or job.exception() is None:
+        return None
+    return time.monotonic() - getattr(job, "finished_at", time.monotonic())
+
+
+def _submit(prompt: str, seed: int, count: int, width: int, height: int, retry_after: float = AVATAR_RETRY_SECONDS):
+    keys = [avatar_key(AVATAR_MODEL, prompt, seed + i, width, height) for i in range(count)]
+    with _jobs_lock:
+        job = _jobs.get((keys[0], count))
+        failed_for = None if job is None else _failed_for(job)
+        # a failure such as a model download error is not cached for good
+        if job is None or (failed_for is not None and failed_for >= retry_after):
+            job = _jobs[keys[0], count] = _executor.submit(_generate, keys, prompt, seed, width, height)
+            job.add_done_callback(_mark_finished)
+    return job
+
+
+def request_avatar(
+    prompt: str = DEFAULT_PROMPT, seed: int = AVATAR_SEED, width: int = AVATAR_SIZE, height: int = AVATAR_SIZE
+) -> Optional[str]:
+    key = avatar_key(AVATAR_MODEL, prompt, seed, width, height)
+    path = get_avatar_store().get(key)
+    if path:
+        return path
+
+    job = _submit(prompt, seed, 1, width, height)
+    # each failure is shown once per session, not on every rerun
+    if job.done() and job.exception() is not None and st.session_state.get("avatar_error") is not job:
+        st.session_state.avatar_error = job
+        st.error(f"Error generating AI avatar: {str(job.exception())}")
+    return None
+
+
+def generate_ai_avatar() -> str:
+    return request_avatar() or PLACEHOLDER_AVATAR
+
+
+def generate_avatar_variants(
+    name: str, gender: str, custom_instructions: str = "", count: int = AVATAR_VARIANTS, seed: int = AVATAR_SEED
+) -> List[str]:
+    prompt = persona_prompt(name, gender, custom_instructions)
+    store = get_avatar_store()
+    paths = [store.get(avatar_key(AVATAR_MODEL, prompt, seed + i, AVATAR_SIZE, AVATAR_SIZE)) for i in range(count)]
+    if all(paths):
+        return paths
+    # asked for with a click, so a failed attempt is retried straight away
+    return _submit(prompt, seed, count, AVATAR_SIZE, AVATAR_SIZE, retry_after=0).result()
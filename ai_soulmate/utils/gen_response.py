@@ -0,0 +1,82 @@
+import time
+from typing import Iterator, List, Optional
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from nexa.gguf import NexaTextInference
+from utils.context import default_context_budget, get_context_window
+from utils.scheduler import get_scheduler
+from utils import service_client
+from utils.telemetry import Turn, get_telemetry
+from utils.memory import MEMORY_NOTE_TOKENS, add_memory_note, recall_memories
+
+
+def _session_id() -> str:
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx is not None else "default"
+
+
+def start_turn() -> Turn:
+    return get_telemetry().start_turn(_session_id())
+
+
+def complete_chat(
+    nexa_model: NexaTextInference,
+    messages: List[dict],
+    params: dict,
+    session_id: str,
+    turn: Optional[Turn] = None,
+    memories: Optional[List[dict]] = None,
+):
+    budget = params.get("context_budget") or default_context_budget(nexa_model)
+    window = get_context_window(nexa_model)
+    # recalled turns go in after fitting, so only turns that were dropped are brought back
+    note_budget = min(MEMORY_NOTE_TOKENS, budget // 4) if memories else 0
+    messages, stats = window.fit(messages, budget - note_budget, session_id)
+    if memories:
+        messages = add_memory_note(messages, memories, window.count, note_budget)
+        stats["prompt_tokens"] = sum(window.count(m) for m in messages)
+    submitted = time.perf_counter()
+
+    def start():
+        if turn is not None:
+            turn.add("queue", time.perf_counter() - submitted)
+            turn.mark("llm_start")
+        return nexa_model.create_chat_completion(
+            messages=messages,
+            temperature=params["temperature"],
+            max_tokens=params["max_new_tokens"],
+            top_k=params["top_k"],
+            top_p=params["top_p"],
+            stream=True,
+        )
+
+    # the completion runs on the model's scheduler thread; raises SchedulerBusy when the queue is full
+    chunks = get_scheduler(nexa_model).submit(session_id, start)
+    if turn is not None:
+        chunks = turn.track_completion(chunks)
+    return stats, chunks
+
+
+def generate_chat_response(
+    nexa_model: NexaTextInference, session_id: Optional[str] = None, turn: Optional[Turn] = None
+) -> Iterator:
+    messages = st.session_state.messages
+    memories = recall_memories(messages, st.session_state.get("conversation"))
+    st.session_state.context_stats, chunks = complete_chat(
+        nexa_model, messages, dict(nexa_model.params), session_id or _session_id(), turn, memories
+    )
+    return chunks
+
+
+def generate_remote_chat_response(model_key, params: dict, turn: Optional[Turn] = None) -> Iterator:
+    def on_stats(stats):
+        st.session_state.context_stats = stats
+
+    messages = st.session_state.messages
+    memories = recall_memories(messages, st.session_state.get("conversation"))
+    chunks = service_client.stream_chat(model_key, messages, params, _session_id(), on_stats, memories)
+    if turn is None:
+        return chunks
+    # queueing and prompt evaluation happen in the service, so both count as prompt_eval here
+    turn.mark("llm_start")
+    return turn.track_completion(chunks)
@@ -0,0 +1,124 @@
+import os
+import uuid
+import streamlit as st
+from nexa.gguf import NexaTextInference
+from utils.model_registry import get_model_registry
+from utils.prefix_cache import attach_prefix_cache
+from utils.conversation_store import get_conversation_store
+from utils.memory import get_memory
+
+# visible messages per page of history, and stored messages kept in memory for the model's context
+HISTORY_PAGE_SIZE = int(os.environ.get("HISTORY_PAGE_SIZE", "20"))
+HISTORY_CONTEXT_MESSAGES = int(os.environ.get("HISTORY_CONTEXT_MESSAGES", "200"))
+
+initial_prompt = """
+# You are Claudia, my perfect girlfriend and soulmate. You will say cheesy and romantic things to me. Start by introuducing yourself briefly. You will say things in a concise way.
+"""
+
+def initialize_chat():
+    key = conversation_key()
+    if (
+        "messages" not in st.session_state
+        or not st.session_state.messages
+        or st.session_state.get("conversation") != key
+    ):
+        system = [m for m in st.session_state.get("messages", []) if m["role"] == "system"]
+        history = get_conversation_store().recent(*key, HISTORY_CONTEXT_MESSAGES)
+        st.session_state.messages = (system or [{"role": "system", "content": initial_prompt}]) + history
+        st.session_state.conversation = key
+        st.session_state.history_pages = 1
+        if history:
+            # a stored conversation carries on without a new introduction
+            st.session_state.intro_sent = True
+
+
+# The conversation belongs to the ?user=<id> in the URL. A new visitor gets a
+# random id written back to the URL, so a reload resumes the same
+# conversation; each persona has its own
+def conversation_key():
+    user_id = st.query_params.get("user")
+    if not user_id:
+        user_id = st.session_state.setdefault("session_user", uuid.uuid4().hex)
+        st.query_params["user"] = user_id
+    return user_id, st.session_state.get("soulmate_name", "Claudia")
+
+
+def save_turn(reply):
+    # the user message is stored together with its reply, so an unanswered message is never persisted
+    user_message = st.session_state.messages[-1]
+    reply_message = {"role": "assistant", "content": reply}
+    get_conversation_store().append(*st.session_state.conversation, [user_message, reply_message])
+    st.session_state.messages.append(reply_message)
+
+    memory = get_memory()
+    if memory is not None and user_message.get("visible", True):
+        # embedded in the background, to be recalled once it has left the context
+        memory.remember(st.session_state.conversation, user_message["content"], reply)
+
+    # only the newest messages stay in memory for the model's context
+    system = [m for m in st.session_state.messages if m["role"] == "system"]
+    turns = [m for m in st.session_state.messages if m["role"] != "system"]
+    if len(turns) > HISTORY_CONTEXT_MESSAGES:
+        st.session_state.messages = system + turns[-HISTORY_CONTEXT_MESSAGES:]
+
+
+def history_page():
+    # the newest pages of visible messages, and whether there are older ones
+    limit = HISTORY_PAGE_SIZE * st.session_state.history_pages
+    messages = get_conversation_store().recent(*st.session_state.conversation, limit + 1, visible_only=True)
+    return messages[-limit:], len(messages) > limit
+
+
+def load_earlier_messages():
+    st.session_state.history_pages += 1
+
+def load_model(model_path):
+    nexa_model = NexaTextInference(
+        model_path=model_path,
+        local_path=None,
+        temperature=0.9,
+        max_new_tokens=256,
+        top_k=50,
+        top_p=1.0,
+    )
+    return attach_prefix_cache(nexa_model, model_path)
+
+def load_local_model(local_path):
+    nexa_model = NexaTextInference(
+        model_path=None,
+        local_path=local_path,
+        temperature=0.9,
+        max_new_tokens=256,
+        top_k=50,
+        top_p=1.0,
+    )
+    return attach_prefix_cache(nexa_model, local_path)
+
+
+# Sessions keep only the key of their model; the registry decides what stays
+# loaded, and a lease keeps a model loaded while a reply is generated.
+def model_key(model_path=None, local_path=None):
+    return ("local", local_path) if local_path else ("hub", model_path)
+
+
+def _loader(key):
+    kind, path = key
+    if kind == "local":
+        return lambda: load_local_model(path)
+    return lambda: load_model(path)
+
+
+def _estimate(key):
+    # a local gguf is mapped from its file; a hub model's size is known once it has been loaded
+    kind, path = key
+    if kind == "local" and os.path.isfile(path):
+        return os.path.getsize(path)
+    return None
+
+
+def get_text_model(key):
+    return get_model_registry().get(key, _loader(key), _estimate(key))
+
+
+def lease_text_model(key):
+    return get_model_registry().lease(key, _loader(key), _estimate(key))
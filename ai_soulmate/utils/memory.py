@@ -0,0 +1,216 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
+
+MEMORY_DIR = os.environ.get("MEMORY_DIR", os.path.join(os.path.expanduser("~"), ".cache", "ai_soulmate", "memory"))
+# on-device embedding model, e.g. nomic-embed-text-v1.5; long-term memory is off unless it is set
+MEMORY_EMBED_MODEL = os.environ.get("MEMORY_EMBED_MODEL", "")
+MEMORY_TOP_K = int(os.environ.get("MEMORY_TOP_K", "4"))
+# prompt tokens set aside for the note of recalled turns
+MEMORY_NOTE_TOKENS = int(os.environ.get("MEMORY_NOTE_TOKENS", "256"))
+# cosine similarity below which a memory is not worth bringing up
+MEMORY_MIN_SCORE = float(os.environ.get("MEMORY_MIN_SCORE", "0.5"))
+
+# rows scored per step of a search, so a large index is never loaded into RAM at once
+SCAN_BLOCK = 65536
+INITIAL_CAPACITY = 1024
+
+logger = logging.getLogger(__name__)
+_memory = None
+_memory_lock = threading.Lock()
+
+
+class VectorIndex:
+    # Append-only vector index in one directory: unit vectors in a float32
+    # memmap, records in a JSON lines file with their byte offsets in a second
+    # memmap, and the row count in a small header. Both memmaps double in size
+    # when full, and the header is written last, so a crash mid-append only
+    # loses that append. Search is an exact dot-product scan in blocks.
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self.dim = None
+        self.count = 0
+        self._capacity = 0
+        self._vectors = None
+        self._offsets = None
+        header = self._path("index.json")
+        if os.path.exists(header):
+            with open(header) as f:
+                meta = json.load(f)
+            self.dim, self.count = meta["dim"], meta["count"]
+            self._open(meta["capacity"])
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _open(self, capacity: int):
+        for name, dtype, width in (("vectors.f32", np.float32, self.dim), ("offsets.u64", np.uint64, 1)):
+            path = self._path(name)
+            with open(path, "ab") as f:
+                f.truncate(capacity * width * np.dtype(dtype).itemsize)
+        self._vectors = np.memmap(self._path("vectors.f32"), dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+        self._offsets = np.memmap(self._path("offsets.u64"), dtype=np.uint64, mode="r+", shape=(capacity,))
+        self._capacity = capacity
+
+    def add(self, vectors: np.ndarray, records: List[dict]):
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(records), -1)
+        with self._lock:
+            if self.dim is None:
+                os.makedirs(self.directory, exist_ok=True)
+                self.dim = vectors.shape[1]
+            if self.count + len(records) > self._capacity:
+                capacity = max(INITIAL_CAPACITY, self._capacity)
+                while capacity < self.count + len(records):
+                    capacity *= 2
+                self._open(capacity)
+
+            with open(self._path("records.jsonl"), "ab") as f:
+                offsets = []
+                for record in records:
+                    offsets.append(f.tell())
+                    f.write(json.dumps(record).encode("utf-8") + b"\n")
+            end = self.count + len(records)
+            self._vectors[self.count:end] = vectors
+            self._offsets[self.count:end] = offsets
+            self._vectors.flush()
+            self._offsets.flush()
+            self.count = end
+
+            tmp_path = self._path(f"index.json.{threading.get_ident()}.tmp")
+            with open(tmp_path, "w") as f:
+                json.dump({"dim": self.dim, "count": self.count, "capacity": self._capacity}, f)
+            os.replace(tmp_path, self._path("index.json"))
+
+    def search(self, query: np.ndarray, k: int) -> List[Tuple[float, dict]]:
+        with self._lock:
+            count, vectors, offsets = self.count, self._vectors, self._offsets
+        if not count or k <= 0:
+            return []
+
+        query = np.asarray(query, dtype=np.float32).ravel()
+        scores, rows = [], []
+        for start in range(0, count, SCAN_BLOCK):
+            block = vectors[start:min(start + SCAN_BLOCK, count)] @ query
+            top = np.argpartition(block, -k)[-k:] if len(block) > k else np.arange(len(block))
+            scores.append(block[top])
+            rows.append(top + start)
+        scores, rows = np.concatenate(scores), np.concatenate(rows)
+        order = np.argsort(-scores)[:k]
+
+        results = []
+        with open(self._path("records.jsonl"), "rb") as f:
+            for i in order:
+                f.seek(int(offsets[rows[i]]))
+                results.append((float(scores[i]), json.loads(f.readline())))
+        return results
+
+
+def _load_embedder() -> Callable[[List[str]], np.ndarray]:
+    from nexa.gguf import NexaTextInference
+
+    model = NexaTextInference(model_path=MEMORY_EMBED_MODEL, local_path=None, embedding=True)
+    # recall runs on the session's thread and updates on the writer thread; the model takes one at a time
+    lock = threading.Lock()
+
+    def embed(texts: List[str]) -> np.ndarray:
+        with lock:
+            vectors = np.asarray(model.model.embed(texts), dtype=np.float32)
+        return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+    return embed
+
+
+class LongTermMemory:
+    # One vector index per conversation. Finished turns are embedded and
+    # added on a background thread, which also loads the embedding model on
+    # first use; until it is loaded, recall() finds nothing rather than
+    # holding up the reply.
+
+    def __init__(self, directory: str, load_embedder: Callable[[], Callable] = _load_embedder):
+        self.directory = directory
+        self._load_embedder = load_embedder
+        self._embed = None
+        self._failed = False
+        self._lock = threading.Lock()
+        self._indexes: Dict[Tuple[str, str], VectorIndex] = {}
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="memory")
+        self._writer.submit(self._embedder)
+
+    def _embedder(self):
+        if self._embed is None and not self._failed:
+            try:
+                self._embed = self._load_embedder()
+            except Exception:
+                logger.exception("Long-term memory disabled, the embedding model failed to load")
+                self._failed = True
+        return self._embed
+
+    def _index(self, conversation) -> VectorIndex:
+        key = tuple(conversation)
+        with self._lock:
+            if key not in self._indexes:
+                name = hashlib.sha1("\0".join(key).encode("utf-8")).hexdigest()[:16]
+                self._indexes[key] = VectorIndex(os.path.join(self.directory, name))
+            return self._indexes[key]
+
+    def remember(self, conversation, user_text: str, reply: str) -> Future:
+        return self._writer.submit(self._add, conversation, user_text, reply)
+
+    def _add(self, conversation, user_text: str, reply: str):
+        embed = self._embedder()
+        if embed is not None:
+            vectors = embed([f"{user_text}\n{reply}"])
+            self._index(conversation).add(vectors, [{"user": user_text, "reply": reply}])
+
+    def recall(self, conversation, query: str, k: int = MEMORY_TOP_K) -> List[dict]:
+        if self._embed is None:
+            return []
+        hits = self._index(conversation).search(self._embed([query])[0], k)
+        return [record for score, record in hits if score >= MEMORY_MIN_SCORE]
+
+
+def get_memory() -> Optional[LongTermMemory]:
+    global _memory
+    if not MEMORY_EMBED_MODEL:
+        return None
+    with _memory_lock:
+        if _memory is None:
+            _memory = LongTermMemory(MEMORY_DIR)
+        return _memory
+
+
+def recall_memories(messages: List[dict], conversation, k: int = MEMORY_TOP_K) -> List[dict]:
+    # past turns most related to the new message, best first; more than k are
+    # returned because the ones still in the prompt are dropped once it is fitted
+    memory = get_memory()
+    if memory is None or conversation is None or not messages or messages[-1]["role"] != "user":
+        return []
+    return memory.recall(conversation, messages[-1]["content"], 2 * k)
+
+
+def add_memory_note(
+    messages: List[dict], memories: List[dict], count: Callable[[dict], int], budget: int, k: int = MEMORY_TOP_K
+) -> List[dict]:
+    # adds recalled turns that did not make it into the fitted prompt as a
+    # system note, as many of the best k as fit in budget tokens
+    in_context = {m["content"] for m in messages}
+    lines = ["Things you remember from earlier conversations with me:"]
+    for r in [r for r in memories if r["user"] not in in_context][:k]:
+        line = f"- I said: {r['user']}\n  You said: {r['reply']}"
+        if count({"role": "system", "content": "\n".join(lines + [line])}) > budget:
+            break
+        lines.append(line)
+    if len(lines) == 1:
+        return messages
+    # just before the new message, so the history ahead of it stays the same
+    # from turn to turn and its prompt cache snapshot can be reused
+    note = {"role": "system", "content": "\n".join(lines)}
+    last_user = next((i for i in range(len(messages) - 1, -1, -1) if messages[i]["role"] == "user"), len(messages))
+    return messages[:last_user] + [note] + messages[last_user:]
@@ -0,0 +1,158 @@
+import gc
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Dict, Hashable, List, Optional
+
+MODEL_MEMORY_BUDGET_GB = float(os.environ.get("MODEL_MEMORY_BUDGET_GB", "16"))
+
+
+def model_size(nexa_model) -> int:
+    # the weights are mapped straight from the gguf file, so its size is a good
+    # estimate of the resident memory; fall back to llama.cpp's own count
+    path = getattr(nexa_model, "downloaded_path", None)
+    if path and os.path.isfile(path):
+        return os.path.getsize(path)
+    return int(nexa_model.model.model_size())
+
+
+class _Entry:
+    def __init__(self, model, size: int):
+        self.model = model
+        self.size = size
+        self.refs = 0
+        self.loaded_at = time.time()
+        self.last_used = self.loaded_at
+
+
+class ModelRegistry:
+    # Loaded models shared by every session, kept within a memory budget.
+    # Models are evicted least recently used first, but never while a lease
+    # is held, so a reply being generated always keeps its model. Room for a
+    # model is made before it is loaded, from an estimate of its size: the
+    # caller's (e.g. the gguf file size), else its size when it was last
+    # loaded, else the whole budget. An evicted model is freed once the last
+    # reference to it goes away, and is loaded again the next time it is
+    # asked for.
+
+    def __init__(self, budget_bytes: int, measure: Callable = model_size):
+        self.budget_bytes = budget_bytes
+        self.measure = measure
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._sizes: Dict[Hashable, int] = {}
+        self.loads = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, loader: Callable, estimate: Optional[int] = None):
+        with self._lock:
+            entry = self._touch(key)
+            if entry is not None:
+                return entry.model
+        # one load at a time, so two sessions asking for the same model share it
+        # and two loads never add up past the budget
+        with self._load_lock:
+            with self._lock:
+                entry = self._touch(key)
+                if entry is not None:
+                    return entry.model
+                if estimate is None:
+                    estimate = self._sizes.get(key, self.budget_bytes)
+                # idle models make room first, so old and new are not resident together
+                self._evict(reserve=estimate)
+            model = loader()
+            with self._lock:
+                size = self._sizes[key] = self.measure(model)
+                self._entries[key] = entry = _Entry(model, size)
+                self.loads += 1
+                self._evict()
+        return model
+
+    @contextmanager
+    def lease(self, key: Hashable, loader: Callable, estimate: Optional[int] = None):
+        while True:
+            model = self.get(key, loader, estimate)
+            with self._lock:
+                entry = self._entries.get(key)
+                # it may have been evicted between get() and taking the lease
+                if entry is not None and entry.model is model:
+                    entry.refs += 1
+                    break
+        try:
+            yield model
+        finally:
+            with self._lock:
+                entry.refs -= 1
+                entry.last_used = time.time()
+                self._evict()
+
+    def is_loaded(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def peek(self, key: Hashable):
+        # the loaded model, or None; unlike get() it never loads and does not count as a use
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry.model if entry is not None else None
+
+    def stats(self) -> Dict:
+        with self._lock:
+            models: List[Dict] = [
+                {
+                    "key": key,
+                    "size": entry.size,
+                    "refs": entry.refs,
+                    "idle_seconds": 0.0 if entry.refs else time.time() - entry.last_used,
+                }
+                for key, entry in reversed(self._entries.items())
+            ]
+            return {
+                "budget": self.budget_bytes,
+                "used": sum(entry.size for entry in self._entries.values()),
+                "loads": self.loads,
+                "evictions": self.evictions,
+                "models": models,
+            }
+
+    def _touch(self, key: Hashable):
+        entry = self._entries.get(key)
+        if entry is not None:
+            entry.last_used = time.time()
+            self._entries.move_to_end(key)
+        return entry
+
+    def _evict(self, reserve: int = 0):
+        used = sum(entry.size for entry in self._entries.values())
+        evicted = False
+        keys = list(self._entries)
+        if not reserve:
+            # the most recently used model stays even if it alone is over budget
+            keys = keys[:-1]
+        for key in keys:
+            if used + reserve <= self.budget_bytes:
+                break
+            entry = self._entries[key]
+            if entry.refs:
+                continue
+            del self._entries[key]
+            used -= entry.size
+            self.evictions += 1
+            evicted = True
+        if evicted:
+            gc.collect()
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_model_registry() -> ModelRegistry:
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ModelRegistry(int(MODEL_MEMORY_BUDGET_GB * 1024**3))
+        return _registry
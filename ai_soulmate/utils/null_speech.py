@@ -0,0 +1,30 @@
+from typing import Optional
+from utils.telemetry import Turn
+
+# Text-only backend: replies are not spoken, and no speech library is imported.
+
+
+class SpeechSession:
+    def __init__(self, voice: str = "", turn: Optional[Turn] = None):
+        pass
+
+    def say(self, text: str):
+        pass
+
+    def render(self):
+        pass
+
+    def finish(self):
+        pass
+
+
+def generate_and_play_response(response_text: str, voice: str = ""):
+    pass
+
+
+def warm_up():
+    pass
+
+
+def sidebar() -> dict:
+    return {}
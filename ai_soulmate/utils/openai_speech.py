@@ -0,0 +1,144 @@
+import logging
+import os
+import threading
+import time
+from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+import streamlit as st
+from openai import OpenAI
+from utils.tts_cache import cache_key, get_tts_cache
+from utils import service_client
+from utils.audio_server import AudioStream, get_audio_server
+from utils.telemetry import Turn
+
+# OpenAI speech backend: fetches mp3 from the OpenAI API and streams it to the browser.
+
+# maximum number of speech requests in flight across all sessions
+TTS_CONCURRENCY = int(os.environ.get("TTS_CONCURRENCY", "4"))
+
+logger = logging.getLogger(__name__)
+_client = None
+_tts_pool = None
+_client_lock = threading.Lock()
+
+
+def get_openai_client() -> OpenAI:
+    global _client
+    with _client_lock:
+        if _client is None:
+            # one client means one keep-alive connection pool shared by every request
+            _client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY", "YOUR_OPENAI_API_KEY"))
+        return _client
+
+
+def get_tts_pool() -> ThreadPoolExecutor:
+    global _tts_pool
+    with _client_lock:
+        if _tts_pool is None:
+            _tts_pool = ThreadPoolExecutor(max_workers=TTS_CONCURRENCY, thread_name_prefix="tts")
+        return _tts_pool
+
+
+def stream_speech(text: str, voice: str, stream: AudioStream):
+    if service_client.service_enabled():
+        for data in service_client.stream_speech(text, voice):
+            stream.write(data)
+        return
+
+    cache = get_tts_cache()
+    key = cache_key("openai", voice, text, model="tts-1")
+    audio = cache.get_bytes(key)
+    if audio is not None:
+        stream.write(audio)
+        return
+
+    parts = []
+    with get_openai_client().audio.speech.with_streaming_response.create(
+        model="tts-1", voice=voice, input=text, response_format="mp3"
+    ) as response:
+        for data in response.iter_bytes(4096):
+            stream.write(data)
+            parts.append(data)
+    cache.put_bytes(key, b"".join(parts))
+
+
+class SpeechSession:
+    # Requests speech for each sentence as soon as the LLM has finished it.
+    # Sentences are fetched concurrently on the shared TTS pool into their own
+    # buffers, and a per-session forwarder copies the buffers to the browser
+    # stream strictly in order, so sentence N plays while N+1 is still loading.
+
+    def __init__(self, voice: str, turn: Optional[Turn] = None):
+        self.voice = voice
+        self.turn = turn
+        server = get_audio_server()
+        self.stream = server.open_stream("audio/mpeg")
+        self.url = server.url_for(self.stream)
+        self._forwarder = ThreadPoolExecutor(max_workers=1)
+        if turn is not None:
+            # the turn is recorded once the last audio has been handed to the browser
+            turn.hold()
+
+    def say(self, text: str):
+        piece = AudioStream("audio/mpeg")
+        get_tts_pool().submit(self._fetch, text, piece)
+        self._forwarder.submit(self._forward, piece)
+
+    def _fetch(self, text: str, piece: AudioStream):
+        started = time.perf_counter()
+        try:
+            stream_speech(text, self.voice, piece)
+        except Exception:
+            logger.exception("Speech synthesis failed")
+        finally:
+            piece.close()
+            if self.turn is not None:
+                self.turn.add("tts", time.perf_counter() - started)
+
+    def _forward(self, piece: AudioStream):
+        for chunk in piece:
+            if self.turn is not None:
+                self.turn.mark("first_audio")
+            self.stream.write(chunk)
+
+    def _close(self):
+        self.stream.close()
+        if self.turn is not None:
+            # the browser plays on; this is the time spent streaming audio to it
+            if self.turn.at("first_audio") is not None:
+                self.turn.add("playback", time.perf_counter() - self.turn.at("first_audio"))
+            self.turn.release()
+
+    def render(self):
+        render_audio(self.url)
+
+    def finish(self):
+        # runs after every queued sentence; the browser keeps playing meanwhile
+        self._forwarder.submit(self._close)
+        self._forwarder.shutdown(wait=False)
+
+
+def render_audio(url: str):
+    st.markdown(
+        f"""
+        <audio autoplay>
+            <source src="{url}" type="audio/mpeg">
+        </audio>
+    """,
+        unsafe_allow_html=True,
+    )
+
+
+def generate_and_play_response(response_text: str, voice: str):
+    speech = SpeechSession(voice)
+    speech.say(response_text)
+    speech.finish()
+    return speech.url
+
+
+def warm_up():
+    pass
+
+
+def sidebar() -> dict:
+    return {}
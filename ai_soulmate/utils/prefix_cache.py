@@ -0,0 +1,184 @@
+import hashlib
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from typing import Optional, Sequence, Tuple
+import numpy as np
+
+PREFIX_CACHE_DIR = os.environ.get(
+    "PREFIX_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "ai_soulmate", "kv")
+)
+PREFIX_CACHE_RAM_MB = float(os.environ.get("PREFIX_CACHE_RAM_MB", "1024"))
+PREFIX_CACHE_DISK_MB = float(os.environ.get("PREFIX_CACHE_DISK_MB", "8192"))
+
+
+def _common_prefix(a: np.ndarray, b: np.ndarray) -> int:
+    n = min(len(a), len(b))
+    mismatch = np.flatnonzero(a[:n] != b[:n])
+    return int(mismatch[0]) if len(mismatch) else n
+
+
+def _state_size(state) -> int:
+    return int(state.llama_state_size) + state.input_ids.nbytes + state.scores.nbytes
+
+
+class PrefixStateCache:
+    # llama.cpp state snapshots keyed by the token prefix they were taken
+    # after. It speaks the cache protocol Llama.create_completion uses: before
+    # a completion the snapshot sharing the longest prefix with the prompt is
+    # restored, so only the new tokens are evaluated, and afterwards Llama
+    # stores a snapshot of prompt + completion. Recent snapshots stay in RAM,
+    # older ones are spilled to disk per model and survive restarts. The
+    # fingerprint identifies the weights; snapshots taken with other weights
+    # under the same model name are deleted rather than restored.
+
+    def __init__(self, model_id: str, directory: str, ram_bytes: int, disk_bytes: int, fingerprint: str = ""):
+        self.directory = os.path.join(directory, hashlib.sha256(model_id.encode("utf-8")).hexdigest()[:16])
+        self.ram_bytes = ram_bytes
+        self.disk_bytes = disk_bytes
+        self._lock = threading.Lock()
+        self._ram = OrderedDict()
+        self._ram_total = 0
+        self._disk = OrderedDict()
+        self._disk_total = 0
+
+        os.makedirs(self.directory, exist_ok=True)
+        self._check_fingerprint(fingerprint)
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".state"):
+                continue
+            key = name[: -len(".state")]
+            try:
+                tokens = np.load(self._path(key, ".tokens.npy"))
+                stat = os.stat(self._path(key, ".state"))
+            except (OSError, ValueError):
+                continue
+            entries.append((stat.st_mtime, key, tokens, stat.st_size))
+        for _, key, tokens, size in sorted(entries, key=lambda e: e[0]):
+            self._disk[key] = (tokens, size)
+            self._disk_total += size
+
+    def _check_fingerprint(self, fingerprint: str):
+        path = os.path.join(self.directory, "fingerprint")
+        try:
+            with open(path) as f:
+                if f.read() == fingerprint:
+                    return
+        except OSError:
+            pass
+        for name in os.listdir(self.directory):
+            if name.endswith((".state", ".state.tmp", ".tokens.npy")):
+                self._remove(name.split(".", 1)[0])
+        with open(path, "w") as f:
+            f.write(fingerprint)
+
+    @property
+    def cache_size(self) -> int:
+        return self._ram_total
+
+    def __getitem__(self, key: Sequence[int]):
+        with self._lock:
+            found = self._find(np.asarray(key, dtype=np.int32))
+            if found is None:
+                raise KeyError(key)
+            prefix_key, in_ram = found
+            if in_ram:
+                self._ram.move_to_end(prefix_key)
+                return self._ram[prefix_key][1]
+
+            tokens, size = self._disk.pop(prefix_key)
+            self._disk_total -= size
+            try:
+                with open(self._path(prefix_key, ".state"), "rb") as f:
+                    state = pickle.load(f)
+            except (OSError, pickle.UnpicklingError, EOFError):
+                self._remove(prefix_key)
+                raise KeyError(key)
+            # promote back to RAM; the disk copy is rewritten if it is spilled again
+            self._remove(prefix_key)
+            self._insert(prefix_key, tokens, state)
+            return state
+
+    def __contains__(self, key: Sequence[int]) -> bool:
+        with self._lock:
+            return self._find(np.asarray(key, dtype=np.int32)) is not None
+
+    def __setitem__(self, key: Sequence[int], state):
+        tokens = np.asarray(key, dtype=np.int32)
+        prefix_key = hashlib.sha256(tokens.tobytes()).hexdigest()
+        with self._lock:
+            if prefix_key in self._ram:
+                self._ram_total -= _state_size(self._ram.pop(prefix_key)[1])
+            if prefix_key in self._disk:
+                self._disk_total -= self._disk.pop(prefix_key)[1]
+                self._remove(prefix_key)
+            self._insert(prefix_key, tokens, state)
+
+    def _find(self, tokens: np.ndarray) -> Optional[Tuple[str, bool]]:
+        best, best_len = None, 0
+        for entries, in_ram in ((self._ram, True), (self._disk, False)):
+            for prefix_key, entry in entries.items():
+                n = _common_prefix(entry[0], tokens)
+                if n > best_len:
+                    best, best_len = (prefix_key, in_ram), n
+        return best
+
+    def _insert(self, prefix_key: str, tokens: np.ndarray, state):
+        self._ram[prefix_key] = (tokens, state)
+        self._ram_total += _state_size(state)
+        while self._ram_total > self.ram_bytes and len(self._ram) > 1:
+            old_key, (old_tokens, old_state) = self._ram.popitem(last=False)
+            self._ram_total -= _state_size(old_state)
+            self._spill(old_key, old_tokens, old_state)
+
+    def _spill(self, prefix_key: str, tokens: np.ndarray, state):
+        state_path = self._path(prefix_key, ".state")
+        try:
+            np.save(self._path(prefix_key, ".tokens.npy"), tokens)
+            with open(state_path + ".tmp", "wb") as f:
+                pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(state_path + ".tmp", state_path)
+        except OSError:
+            self._remove(prefix_key)
+            return
+        size = os.path.getsize(state_path)
+        self._disk[prefix_key] = (tokens, size)
+        self._disk_total += size
+        while self._disk_total > self.disk_bytes and self._disk:
+            old_key, (_, old_size) = self._disk.popitem(last=False)
+            self._disk_total -= old_size
+            self._remove(old_key)
+
+    def _path(self, prefix_key: str, suffix: str) -> str:
+        return os.path.join(self.directory, prefix_key + suffix)
+
+    def _remove(self, prefix_key: str):
+        for suffix in (".state", ".state.tmp", ".tokens.npy"):
+            try:
+                os.remove(self._path(prefix_key, suffix))
+            except OSError:
+                pass
+
+
+def model_fingerprint(path: Optional[str]) -> str:
+    # size and modification time of the gguf, which change when it is replaced or re-downloaded
+    if not path or not os.path.isfile(path):
+        return ""
+    stat = os.stat(path)
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def attach_prefix_cache(nexa_model, model_id: str):
+    path = getattr(nexa_model, "downloaded_path", None) or model_id
+    nexa_model.model.set_cache(
+        PrefixStateCache(
+            model_id,
+            PREFIX_CACHE_DIR,
+            int(PREFIX_CACHE_RAM_MB * 1024 * 1024),
+            int(PREFIX_CACHE_DISK_MB * 1024 * 1024),
+            model_fingerprint(path),
+        )
+    )
+    return nexa_model
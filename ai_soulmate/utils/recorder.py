@@ -0,0 +1,88 @@
+import queue
+from collections import deque
+from typing import Callable, Optional
+import numpy as np
+import sounddevice as sd
+
+BLOCK_SECONDS = 0.03
+
+
+class VoiceRecorder:
+    # Records from the microphone until the speaker pauses. Speech is detected
+    # from block energy against a noise floor measured in the first few blocks.
+    # Blocks seen before speech starts go into a short pre-roll buffer so the
+    # first syllable is not clipped.
+
+    def __init__(
+        self,
+        fs: int = 16000,
+        max_duration: float = 15.0,
+        silence_duration: float = 0.8,
+        pre_roll: float = 0.3,
+        no_speech_timeout: float = 5.0,
+        min_threshold: float = 0.01,
+        calibration: float = 0.3,
+    ):
+        self.fs = fs
+        self.block_size = int(fs * BLOCK_SECONDS)
+        self.max_blocks = int(max_duration / BLOCK_SECONDS)
+        self.silence_blocks = max(1, int(silence_duration / BLOCK_SECONDS))
+        self.pre_roll_blocks = max(1, int(pre_roll / BLOCK_SECONDS))
+        self.no_speech_blocks = int(no_speech_timeout / BLOCK_SECONDS)
+        self.calibration_blocks = max(1, int(calibration / BLOCK_SECONDS))
+        self.min_threshold = min_threshold
+
+    def record(self, on_audio: Optional[Callable[[np.ndarray], None]] = None) -> np.ndarray:
+        blocks = queue.Queue()
+
+        def callback(indata, frames, time, status):
+            blocks.put(indata[:, 0].copy())
+
+        pre_roll = deque(maxlen=self.pre_roll_blocks)
+        noise = []
+        captured = []
+        threshold = self.min_threshold
+        speaking = False
+        silent_blocks = 0
+        n_blocks = 0
+
+        with sd.InputStream(
+            samplerate=self.fs, channels=1, dtype="float32", blocksize=self.block_size, callback=callback
+        ):
+            while n_blocks < self.max_blocks:
+                try:
+                    block = blocks.get(timeout=1.0)
+                except queue.Empty:
+                    break
+                n_blocks += 1
+                rms = float(np.sqrt(np.mean(block ** 2)))
+
+                if n_blocks <= self.calibration_blocks:
+                    noise.append(rms)
+                    pre_roll.append(block)
+                    if n_blocks == self.calibration_blocks:
+                        threshold = max(self.min_threshold, 3.0 * float(np.percentile(noise, 25)))
+                    continue
+
+                if not speaking:
+                    pre_roll.append(block)
+                    if rms <= threshold:
+                        if n_blocks >= self.no_speech_blocks:
+                            break
+                        continue
+                    speaking = True
+                    new_blocks = list(pre_roll)
+                else:
+                    silent_blocks = silent_blocks + 1 if rms < threshold else 0
+                    new_blocks = [block]
+
+                captured.extend(new_blocks)
+                if on_audio is not None:
+                    for new_block in new_blocks:
+                        on_audio(new_block)
+                if silent_blocks >= self.silence_blocks:
+                    break
+
+        if not captured:
+            return np.zeros(0, dtype=np.float32)
+        return np.concatenate(captured)
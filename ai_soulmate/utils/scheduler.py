@@ -0,0 +1,141 @@
+import os
+import queue
+import threading
+import time
+import weakref
+from collections import OrderedDict, deque
+from typing import Callable, Dict, Iterator
+
+import numpy as np
+
+# waiting requests across all sessions, and per session, before new ones are refused
+SCHEDULER_MAX_QUEUE = int(os.environ.get("SCHEDULER_MAX_QUEUE", "8"))
+SCHEDULER_MAX_PER_SESSION = int(os.environ.get("SCHEDULER_MAX_PER_SESSION", "2"))
+
+_DONE = object()
+
+
+class SchedulerBusy(Exception):
+    pass
+
+
+class _Job:
+    def __init__(self, session_id: str, start: Callable[[], Iterator]):
+        self.session_id = session_id
+        self.start = start
+        self.results = queue.Queue()
+        self.cancelled = threading.Event()
+        self.enqueued_at = time.monotonic()
+
+
+class ModelScheduler:
+    # Owns one model: its completions run one at a time on a worker thread,
+    # and chunks are handed back to the caller through a queue. Waiting
+    # requests are grouped by session and served round robin, so one busy tab
+    # cannot starve the others, and requests beyond the queue limits are
+    # refused with SchedulerBusy instead of piling up.
+
+    def __init__(self, max_queue: int = SCHEDULER_MAX_QUEUE, max_per_session: int = SCHEDULER_MAX_PER_SESSION):
+        self.max_queue = max_queue
+        self.max_per_session = max_per_session
+        self._cond = threading.Condition()
+        self._sessions: "OrderedDict[str, deque]" = OrderedDict()
+        self._depth = 0
+        self._worker = None
+        self._waits = deque(maxlen=256)
+        self.running = None
+        self.completed = 0
+        self.rejected = 0
+
+    def submit(self, session_id: str, start: Callable[[], Iterator]) -> Iterator:
+        job = _Job(session_id, start)
+        with self._cond:
+            pending = self._sessions.get(session_id)
+            if self._depth >= self.max_queue or (pending and len(pending) >= self.max_per_session):
+                self.rejected += 1
+                raise SchedulerBusy(f"{self._depth} requests are already waiting")
+            self._sessions.setdefault(session_id, deque()).append(job)
+            self._depth += 1
+            # the worker exits when the queue drains, so an unused model leaves no thread behind
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, daemon=True, name="text-scheduler")
+                self._worker.start()
+            self._cond.notify()
+        return self._results(job)
+
+    def stats(self) -> Dict:
+        with self._cond:
+            waits = np.array(self._waits) if self._waits else np.zeros(1)
+            return {
+                "queue_depth": self._depth,
+                "running": self.running,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "wait_avg": float(waits.mean()),
+                "wait_p95": float(np.percentile(waits, 95)),
+            }
+
+    @staticmethod
+    def _results(job: _Job) -> Iterator:
+        try:
+            while True:
+                item = job.results.get()
+                if item is _DONE:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            # the caller stopped reading (finished, failed or its script was rerun)
+            job.cancelled.set()
+
+    def _next_job(self) -> _Job:
+        session_id, pending = next(iter(self._sessions.items()))
+        job = pending.popleft()
+        if pending:
+            self._sessions.move_to_end(session_id)
+        else:
+            del self._sessions[session_id]
+        self._depth -= 1
+        return job
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._depth:
+                    self._worker = None
+                    return
+                job = self._next_job()
+                if job.cancelled.is_set():
+                    continue
+                self._waits.append(time.monotonic() - job.enqueued_at)
+                self.running = job.session_id
+
+            chunks = None
+            try:
+                chunks = job.start()
+                for chunk in chunks:
+                    if job.cancelled.is_set():
+                        break
+                    job.results.put(chunk)
+            except Exception as e:
+                job.results.put(e)
+            finally:
+                if hasattr(chunks, "close"):
+                    chunks.close()
+                job.results.put(_DONE)
+                with self._cond:
+                    self.running = None
+                    self.completed += 1
+
+
+_schedulers = weakref.WeakKeyDictionary()
+_schedulers_lock = threading.Lock()
+
+
+def get_scheduler(nexa_model) -> ModelScheduler:
+    with _schedulers_lock:
+        scheduler = _schedulers.get(nexa_model)
+        if scheduler is None:
+            scheduler = _schedulers[nexa_model] = ModelScheduler()
+        return scheduler
@@ -0,0 +1,35 @@
+import re
+from typing import List
+
+_SENTENCE_END = re.compile(r"[.!?…]+[\"')\]]*\s+|\n+")
+# only when the whole last word is one, so "best." or "dreams." still end a sentence
+_ABBREVIATION = re.compile(r"(?:^|\s)(?:mr|mrs|ms|dr|st|vs|e\.g|i\.e)\.$", re.IGNORECASE)
+
+
+class SentenceSegmenter:
+    # Turns a stream of LLM tokens into complete sentences. A sentence is only
+    # emitted once the whitespace after its final punctuation has arrived, so
+    # "3.5" or "..." split across tokens is never cut too early. Very short
+    # sentences are merged with the next one to avoid choppy speech.
+
+    def __init__(self, min_length: int = 20):
+        self.min_length = min_length
+        self._buffer = ""
+
+    def feed(self, text: str) -> List[str]:
+        self._buffer += text
+        sentences = []
+        start = 0
+        for match in _SENTENCE_END.finditer(self._buffer):
+            candidate = self._buffer[start:match.end()].strip()
+            if len(candidate) < self.min_length or _ABBREVIATION.search(candidate):
+                continue
+            sentences.append(candidate)
+            start = match.end()
+        self._buffer = self._buffer[start:]
+        return sentences
+
+    def flush(self) -> List[str]:
+        rest = self._buffer.strip()
+        self._buffer = ""
+        return [rest] if rest else []
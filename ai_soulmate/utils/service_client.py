@@ -0,0 +1,112 @@
+import json
+import os
+import struct
+import urllib.error
+import urllib.parse
+import urllib.request
+from types import SimpleNamespace
+from typing import Callable, Dict, Iterator, List, Optional
+import numpy as np
+from utils.scheduler import SchedulerBusy
+
+# when set, the app sends inference to service.py instead of loading models itself
+SERVICE_URL = os.environ.get("SOULMATE_SERVICE_URL", "").rstrip("/")
+SERVICE_TIMEOUT = float(os.environ.get("SOULMATE_SERVICE_TIMEOUT", "300"))
+
+
+def service_enabled() -> bool:
+    return bool(SERVICE_URL)
+
+
+def _request(path: str, payload=None, data: Optional[bytes] = None, query: Optional[Dict] = None):
+    url = SERVICE_URL + path
+    if query:
+        url += "?" + urllib.parse.urlencode(query)
+    headers = {"Content-Type": "application/octet-stream"}
+    if payload is not None:
+        data = json.dumps(payload).encode("utf-8")
+        headers["Content-Type"] = "application/json"
+    request = urllib.request.Request(url, data=data, headers=headers, method="GET" if data is None else "POST")
+    try:
+        return urllib.request.urlopen(request, timeout=SERVICE_TIMEOUT)
+    except urllib.error.HTTPError as e:
+        if e.code == 503:
+            raise SchedulerBusy(e.read().decode("utf-8", "replace"))
+        raise
+
+
+def _events(response) -> Iterator[dict]:
+    # newline-delimited JSON, one event per line as the service produces it
+    with response:
+        for line in response:
+            if line.strip():
+                yield json.loads(line)
+
+
+def load_model(model_key) -> Dict:
+    with _request("/v1/models/load", {"model": list(model_key)}) as response:
+        return json.load(response)
+
+
+def get_stats(model_key) -> Dict:
+    with _request("/v1/stats", query={"model": json.dumps(list(model_key))}) as response:
+        return json.load(response)
+
+
+def stream_chat(
+    model_key,
+    messages: List[dict],
+    params: Dict,
+    session_id: str,
+    on_stats: Optional[Callable[[Dict], None]] = None,
+    memories: Optional[List[dict]] = None,
+) -> Iterator[dict]:
+    payload = {"model": list(model_key), "messages": messages, "params": params, "session_id": session_id}
+    if memories:
+        # the service fits the prompt, so it also decides which memories still need a note
+        payload["memories"] = memories
+    for event in _events(_request("/v1/chat", payload)):
+        if "context_stats" in event:
+            if on_stats is not None:
+                on_stats(event["context_stats"])
+            continue
+        # same shape as a local streamed chat completion chunk
+        yield {"choices": [{"delta": {"content": event["text"]}}]}
+
+
+class RemoteWhisper:
+    # Stands in for the faster-whisper model: same transcribe() call, but the
+    # audio is decoded by the service and segments come back as they finish.
+
+    def transcribe(self, audio: np.ndarray, beam_size: int = 5, initial_prompt: Optional[str] = None, **options):
+        query = {"beam_size": beam_size}
+        if initial_prompt:
+            query["initial_prompt"] = initial_prompt
+        if "condition_on_previous_text" in options:
+            query["condition_on_previous_text"] = str(bool(options["condition_on_previous_text"])).lower()
+        data = np.ascontiguousarray(audio, dtype=np.float32).tobytes()
+        events = _events(_request("/v1/transcribe", data=data, query=query))
+        return (SimpleNamespace(**event) for event in events), None
+
+
+def synthesize(texts: List[str], voice: str, tier: Optional[str] = None) -> Iterator[np.ndarray]:
+    # one waveform per text, each framed by its length in bytes
+    payload = {"texts": texts, "voice": voice, "format": "pcm"}
+    if tier is not None:
+        payload["tier"] = tier
+    with _request("/v1/speech", payload) as response:
+        while True:
+            header = response.read(4)
+            if len(header) < 4:
+                return
+            (size,) = struct.unpack("<I", header)
+            yield np.frombuffer(response.read(size), dtype=np.float32)
+
+
+def stream_speech(text: str, voice: str, chunk_size: int = 4096) -> Iterator[bytes]:
+    with _request("/v1/speech", {"text": text, "voice": voice, "format": "mp3"}) as response:
+        while True:
+            data = response.read(chunk_size)
+            if not data:
+                return
+            yield data
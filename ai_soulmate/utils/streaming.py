@@ -0,0 +1,47 @@
+import os
+import time
+from typing import Callable, Iterable, Optional
+
+RENDER_INTERVAL = float(os.environ.get("RENDER_INTERVAL", "0.1"))
+RENDER_EVERY_TOKENS = int(os.environ.get("RENDER_EVERY_TOKENS", "16"))
+
+
+def chunk_text(chunk) -> str:
+    # chat completions stream deltas, plain completions stream text
+    choice = chunk["choices"][0]
+    if "delta" in choice:
+        return choice["delta"].get("content") or ""
+    return choice.get("text") or ""
+
+
+def stream_response(
+    chunks: Iterable[dict],
+    placeholder,
+    on_text: Optional[Callable[[str], None]] = None,
+    interval: float = RENDER_INTERVAL,
+    every_tokens: int = RENDER_EVERY_TOKENS,
+) -> str:
+    # Every markdown() call re-sends the whole reply to the browser, so tokens
+    # are buffered and the placeholder is only redrawn once `interval` seconds
+    # or `every_tokens` tokens have passed since the last redraw.
+    text = ""
+    pending = []
+    last_render = time.monotonic()
+    for chunk in chunks:
+        content = chunk_text(chunk)
+        if not content:
+            continue
+        pending.append(content)
+        if on_text is not None:
+            on_text(content)
+
+        now = time.monotonic()
+        if len(pending) >= every_tokens or now - last_render >= interval:
+            text += "".join(pending)
+            pending.clear()
+            placeholder.markdown(text, unsafe_allow_html=True)
+            last_render = now
+
+    text += "".join(pending)
+    placeholder.markdown(text)
+    return text
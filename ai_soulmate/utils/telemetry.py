@@ -0,0 +1,233 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from logging.handlers import RotatingFileHandler
+from typing import Dict, Iterator, List, Optional
+
+# JSON lines log of finished turns; empty disables it
+TELEMETRY_LOG = os.environ.get(
+    "TELEMETRY_LOG", os.path.join(os.path.expanduser("~"), ".cache", "ai_soulmate", "turns.jsonl")
+)
+TELEMETRY_LOG_MB = float(os.environ.get("TELEMETRY_LOG_MB", "10"))
+TELEMETRY_LOG_BACKUPS = int(os.environ.get("TELEMETRY_LOG_BACKUPS", "3"))
+# port of the Prometheus text endpoint; 0 disables it
+METRICS_HOST = os.environ.get("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.environ.get("METRICS_PORT", "9464"))
+
+# stages are durations, summed when a stage runs more than once in a turn
+# (e.g. one tts span per sentence); milestones are offsets from the turn start
+STAGES = ["recording", "stt", "queue", "prompt_eval", "generation", "tts", "playback"]
+MILESTONES = ["first_token", "first_audio", "done"]
+BUCKETS = [0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0]
+
+logger = logging.getLogger(__name__)
+_telemetry = None
+_server = None
+_lock = threading.Lock()
+
+
+class Turn:
+    # Timings of one chat turn, filled in from the Streamlit thread, the
+    # scheduler worker and the speech threads. The turn is recorded once
+    # finish() has been called and every hold() has been released, so speech
+    # that outlives the script run is still counted.
+
+    def __init__(self, session_id: str, telemetry: "Telemetry"):
+        self.session_id = session_id
+        self.started = time.perf_counter()
+        self.spans: Dict[str, float] = {}
+        self.marks: Dict[str, float] = {}
+        self._telemetry = telemetry
+        self._lock = threading.Lock()
+        self._holds = 0
+        self._finished = False
+
+    def add(self, stage: str, seconds: float):
+        with self._lock:
+            self.spans[stage] = self.spans.get(stage, 0.0) + max(0.0, seconds)
+
+    def mark(self, milestone: str, at: Optional[float] = None):
+        with self._lock:
+            if milestone not in self.marks:
+                self.marks[milestone] = (at or time.perf_counter()) - self.started
+
+    def at(self, milestone: str) -> Optional[float]:
+        offset = self.marks.get(milestone)
+        return None if offset is None else self.started + offset
+
+    @contextmanager
+    def span(self, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - start)
+
+    def track_completion(self, chunks: Iterator) -> Iterator:
+        # prompt evaluation runs from "llm_start" to the first chunk, generation from there to the last
+        first = last = None
+        try:
+            for chunk in chunks:
+                last = time.perf_counter()
+                if first is None:
+                    first = last
+                    self.add("prompt_eval", first - (self.at("llm_start") or first))
+                    self.mark("first_token", first)
+                yield chunk
+        finally:
+            # closing early must still reach the scheduler, which cancels the completion
+            if hasattr(chunks, "close"):
+                chunks.close()
+            if first is not None:
+                self.add("generation", last - first)
+
+    def hold(self):
+        with self._lock:
+            self._holds += 1
+
+    def release(self):
+        with self._lock:
+            self._holds -= 1
+            ready = self._finished and not self._holds
+        if ready:
+            self._record()
+
+    def finish(self):
+        with self._lock:
+            self._finished = True
+            ready = not self._holds
+        if ready:
+            self._record()
+
+    def _record(self):
+        self.mark("done")
+        with self._lock:
+            record = {
+                "ts": time.time(),
+                "session": self.session_id,
+                "spans": {k: round(v, 4) for k, v in self.spans.items()},
+                "marks": {k: round(v, 4) for k, v in self.marks.items() if k in MILESTONES},
+            }
+        self._telemetry.record(record)
+
+
+class _Histogram:
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        for i, bound in enumerate(BUCKETS):
+            if value <= bound:
+                self.counts[i] += 1
+        self.total += 1
+        self.sum += value
+
+
+class Telemetry:
+    # Collects finished turns: keeps the last few for the sidebar, appends
+    # each one to a rotating JSON lines log and aggregates them into
+    # histograms for the Prometheus endpoint.
+
+    def __init__(self, log_path: str = TELEMETRY_LOG, keep: int = 50):
+        self._lock = threading.Lock()
+        self._recent = deque(maxlen=keep)
+        self._stages = {name: _Histogram() for name in STAGES}
+        self._milestones = {name: _Histogram() for name in MILESTONES}
+        self.turns = 0
+        self._log = None
+        if log_path:
+            try:
+                os.makedirs(os.path.dirname(log_path) or ".", exist_ok=True)
+                handler = RotatingFileHandler(
+                    log_path, maxBytes=int(TELEMETRY_LOG_MB * 1024 * 1024), backupCount=TELEMETRY_LOG_BACKUPS
+                )
+            except OSError:
+                logger.exception("Turn log disabled")
+            else:
+                handler.setFormatter(logging.Formatter("%(message)s"))
+                self._log = logging.getLogger("ai_soulmate.turns")
+                self._log.setLevel(logging.INFO)
+                self._log.propagate = False
+                self._log.addHandler(handler)
+
+    def start_turn(self, session_id: str) -> Turn:
+        return Turn(session_id, self)
+
+    def record(self, record: dict):
+        with self._lock:
+            self._recent.append(record)
+            self.turns += 1
+            for name, seconds in record["spans"].items():
+                self._stages.setdefault(name, _Histogram()).observe(seconds)
+            for name, seconds in record["marks"].items():
+                self._milestones[name].observe(seconds)
+        if self._log is not None:
+            self._log.info(json.dumps(record))
+
+    def recent(self, n: int = 10) -> List[dict]:
+        with self._lock:
+            return list(self._recent)[-n:]
+
+    def prometheus(self) -> str:
+        lines = ["# HELP soulmate_turns_total Chat turns recorded.", "# TYPE soulmate_turns_total counter"]
+        with self._lock:
+            lines.append(f"soulmate_turns_total {self.turns}")
+            for metric, label, histograms, help_text in (
+                ("soulmate_turn_stage_seconds", "stage", self._stages, "Time spent in each stage of a turn."),
+                ("soulmate_turn_milestone_seconds", "milestone", self._milestones, "Time from the start of a turn."),
+            ):
+                lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} histogram"]
+                for name, histogram in histograms.items():
+                    for bound, count in zip(BUCKETS, histogram.counts):
+                        lines.append(f'{metric}_bucket{{{label}="{name}",le="{bound:g}"}} {count}')
+                    lines.append(f'{metric}_bucket{{{label}="{name}",le="+Inf"}} {histogram.total}')
+                    lines.append(f'{metric}_sum{{{label}="{name}"}} {histogram.sum:.6f}')
+                    lines.append(f'{metric}_count{{{label}="{name}"}} {histogram.total}')
+        return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.rstrip("/") != "/metrics":
+            self.send_error(404)
+            return
+        body = get_telemetry().prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def get_telemetry() -> Telemetry:
+    global _telemetry
+    with _lock:
+        if _telemetry is None:
+            _telemetry = Telemetry()
+        return _telemetry
+
+
+def start_metrics_server():
+    # one endpoint per process, shared by every session; a taken port only disables the endpoint
+    global _server
+    with _lock:
+        if _server is not None or not METRICS_PORT:
+            return
+        try:
+            _server = ThreadingHTTPServer((METRICS_HOST, METRICS_PORT), _MetricsHandler)
+        except OSError:
+            logger.warning("Metrics endpoint disabled, port %s is not available", METRICS_PORT)
+            _server = False
+            return
+        _server.daemon_threads = True
+        threading.Thread(target=_server.serve_forever, daemon=True, name="metrics").start()
@@ -0,0 +1,172 @@
+import streamlit as st
+import os
+import threading
+import time
+import numpy as np
+from nexa.gguf import NexaVoiceInference
+from utils.recorder import VoiceRecorder
+from utils.service_client import RemoteWhisper, service_enabled
+
+WHISPER_WARMUP = os.environ.get("WHISPER_WARMUP", "true").lower() == "true"
+
+_voice_model = None
+_voice_model_lock = threading.Lock()
+_warmup_thread = None
+_warmup_lock = threading.Lock()
+
+
+def get_voice_model():
+    global _voice_model
+    with _voice_model_lock:
+        if _voice_model is None:
+            _voice_model = NexaVoiceInference(
+                model_path="faster-whisper-base",
+                local_path=None,
+                beam_size=5,
+                task="transcribe",
+                temperature=0.0,
+                compute_type="default",
+            )
+        return _voice_model
+
+
+def _warm_up():
+    voice_model = get_voice_model()
+    # one short decode so the first real turn does not pay for lazy initialization
+    segments, _ = voice_model.model.transcribe(np.zeros(16000, dtype=np.float32), beam_size=1)
+    list(segments)
+
+
+def warm_up_voice_model():
+    global _warmup_thread
+    with _warmup_lock:
+        if not WHISPER_WARMUP or service_enabled() or _warmup_thread is not None:
+            return
+        _warmup_thread = threading.Thread(target=_warm_up, name="whisper-warmup", daemon=True)
+        _warmup_thread.start()
+
+
+class StreamingTranscriber:
+    # Decodes the not-yet-committed tail of the recording every `step` seconds
+    # while the user is still speaking. Segments that end more than
+    # `stable_margin` before the end of the window will not change with more
+    # audio, so they are committed and never decoded again. When capture
+    # stops, only the short uncommitted tail is left to transcribe.
+
+    def __init__(self, model, fs=16000, step=1.0, stable_margin=1.0, max_window=15.0):
+        self.model = model
+        self.fs = fs
+        self.step_samples = int(step * fs)
+        self.stable_margin = stable_margin
+        self.max_window_samples = int(max_window * fs)
+        self._blocks = []
+        self._samples = 0
+        self._committed_text = ""
+        self._committed_samples = 0
+        self._tentative_text = ""
+        self._closed = False
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    def add(self, block: np.ndarray):
+        with self._lock:
+            self._blocks.append(block)
+            self._samples += len(block)
+        self._wake.set()
+
+    @property
+    def partial_text(self) -> str:
+        with self._lock:
+            return self._committed_text + self._tentative_text
+
+    def close(self):
+        # stops the background decoder; safe to call more than once
+        self._closed = True
+        self._wake.set()
+        self._worker.join()
+
+    def finish(self) -> str:
+        self.close()
+        if self._samples > self._committed_samples:
+            self._decode(final=True)
+        return self._committed_text
+
+    def _run(self):
+        decoded_at = 0
+        while True:
+            self._wake.wait(timeout=0.2)
+            self._wake.clear()
+            if self._closed:
+                return
+            if self._samples - decoded_at >= self.step_samples:
+                decoded_at = self._samples
+                self._decode(final=False)
+
+    def _decode(self, final: bool):
+        with self._lock:
+            audio = np.concatenate(self._blocks)
+            self._blocks = [audio]
+            offset = self._committed_samples
+            prompt = self._committed_text[-200:] or None
+        window = np.ascontiguousarray(audio[offset:], dtype=np.float32)
+        window_seconds = len(window) / self.fs
+
+        segments, _ = self.model.transcribe(
+            window,
+            beam_size=5 if final else 1,
+            initial_prompt=prompt,
+            condition_on_previous_text=False,
+        )
+        segments = list(segments)
+
+        stable = []
+        for i, segment in enumerate(segments):
+            is_last = i == len(segments) - 1
+            # an over-long window commits everything but its last segment
+            if final or segment.end < window_seconds - self.stable_margin or (
+                len(window) > self.max_window_samples and not is_last
+            ):
+                stable.append(segment)
+            else:
+                break
+
+        with self._lock:
+            if stable:
+                self._committed_text += "".join(segment.text for segment in stable)
+                self._committed_samples = offset + min(len(window), int(stable[-1].end * self.fs))
+            self._tentative_text = "".join(segment.text for segment in segments[len(stable):])
+
+
+def record_and_transcribe(max_duration=15, fs=16000, silence_duration=0.8, pre_roll=0.3, turn=None):
+    info_placeholder = st.empty()
+    info_placeholder.info("Listening... I'll stop when you pause.")
+
+    recorder = VoiceRecorder(
+        fs=fs, max_duration=max_duration, silence_duration=silence_duration, pre_roll=pre_roll
+    )
+    model = RemoteWhisper() if service_enabled() else get_voice_model().model
+    transcriber = StreamingTranscriber(model, fs=fs)
+    shown = ""
+
+    def on_audio(block):
+        nonlocal shown
+        transcriber.add(block)
+        text = transcriber.partial_text
+        if text != shown:
+            shown = text
+            info_placeholder.info(f"Listening... {text.strip()}")
+
+    started = time.perf_counter()
+    try:
+        audio = recorder.record(on_audio)
+    finally:
+        transcriber.close()
+    recorded = time.perf_counter()
+    transcription = transcriber.finish() if len(audio) else ""
+    if turn is not None:
+        turn.add("recording", recorded - started)
+        turn.add("stt", time.perf_counter() - recorded)
+    info_placeholder.empty()
+    return transcription
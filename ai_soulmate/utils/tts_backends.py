@@ -0,0 +1,85 @@
+import importlib
+import importlib.util
+import os
+from typing import Dict, List, Sequence
+
+# speech backend used when a session has not picked one: bark, openai or null (text only)
+TTS_BACKEND = os.environ.get("TTS_BACKEND", "null")
+
+
+class TTSBackend:
+    # What the app needs to know about a speech backend before using it. The
+    # implementation module, and with it torch, Bark or the OpenAI client, is
+    # only imported when load() is first called, so a text-only app never
+    # pays for speech it does not use.
+    #
+    # Every implementation module provides SpeechSession(voice, turn=None,
+    # **options) with say(), render() and finish(), plus
+    # generate_and_play_response(), warm_up() and sidebar(), which draws the
+    # backend's own settings and returns the options for SpeechSession.
+    # `requires` lists the packages it imports, so the app can leave out
+    # backends whose dependencies are not installed without importing them.
+
+    def __init__(
+        self,
+        name: str,
+        label: str,
+        module: str,
+        voices: Dict[str, str],
+        default_voice: str,
+        requires: Sequence[str] = (),
+    ):
+        self.name = name
+        self.label = label
+        self.module = module
+        self.voices = voices
+        self.default_voice = default_voice
+        self.requires = tuple(requires)
+
+    def available(self) -> bool:
+        return all(importlib.util.find_spec(package) is not None for package in self.requires)
+
+    def load(self):
+        return importlib.import_module(self.module)
+
+
+BACKENDS = {
+    "bark": TTSBackend(
+        "bark",
+        "Bark (local)",
+        "utils.bark_speech",
+        {
+            "Female voice 1": "v2/en_speaker_6",
+            "Female voice 2": "v2/en_speaker_9",
+            "Male voice 1": "v2/en_speaker_7",
+            "Male voice 2": "v2/en_speaker_8",
+        },
+        "v2/en_speaker_9",
+        requires=("bark", "torch", "sounddevice"),
+    ),
+    "openai": TTSBackend(
+        "openai",
+        "OpenAI",
+        "utils.openai_speech",
+        {
+            "Female (Nova) - Soft and natural": "nova",
+            "Female (Shimmer) - Clear and bright": "shimmer",
+            "Female (Alloy) - Warm and professional": "alloy",
+            "Male (Echo) - Balanced and clear": "echo",
+            "Male (Onyx) - Deep and authoritative": "onyx",
+            "Male (Fable) - British accent, warm": "fable",
+        },
+        "nova",
+        requires=("openai",),
+    ),
+    "null": TTSBackend("null", "Text only", "utils.null_speech", {}, ""),
+}
+
+
+def get_tts_backend(name: str = None) -> TTSBackend:
+    return BACKENDS[name or TTS_BACKEND]
+
+
+def available_backends() -> List[str]:
+    # text only needs nothing, so there is always at least one
+    return [name for name, backend in BACKENDS.items() if backend.available()]
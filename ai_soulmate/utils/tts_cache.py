@@ -0,0 +1,146 @@
+import hashlib
+import json
+import mmap
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+import numpy as np
+
+CACHE_DIR = os.environ.get(
+    "TTS_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "ai_soulmate", "tts")
+)
+CACHE_MAX_MB = float(os.environ.get("TTS_CACHE_MAX_MB", "512"))
+
+
+def normalize_text(text: str) -> str:
+    return " ".join(text.split())
+
+
+def cache_key(backend: str, voice: str, text: str, **params) -> str:
+    payload = json.dumps(
+        {"backend": backend, "voice": voice, "text": normalize_text(text), "params": params},
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class TTSCache:
+    # Content-addressed store of synthesized speech. Waveforms are kept as .npy
+    # and encoded audio as .mp3, both read back memory-mapped. File mtimes carry
+    # the LRU order across restarts and between processes sharing the directory.
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._total = 0
+
+        os.makedirs(directory, exist_ok=True)
+        files = []
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            if name.endswith(".tmp"):
+                self._remove(path)
+                continue
+            stat = os.stat(path)
+            files.append((stat.st_mtime, name, stat.st_size))
+        for _, name, size in sorted(files):
+            self._entries[name] = size
+            self._total += size
+        with self._lock:
+            self._evict()
+
+    def get_array(self, key: str) -> Optional[np.ndarray]:
+        path = self._lookup(key + ".npy")
+        if path is None:
+            return None
+        try:
+            return np.load(path, mmap_mode="r")
+        except (OSError, ValueError):
+            self._discard(key + ".npy")
+            return None
+
+    def get_bytes(self, key: str, ext: str = "mp3"):
+        path = self._lookup(f"{key}.{ext}")
+        if path is None:
+            return None
+        try:
+            with open(path, "rb") as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return b""
+                return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except OSError:
+            self._discard(f"{key}.{ext}")
+            return None
+
+    def put_array(self, key: str, audio_array: np.ndarray):
+        self._store(key + ".npy", lambda f: np.save(f, np.asarray(audio_array)))
+
+    def put_bytes(self, key: str, data: bytes, ext: str = "mp3"):
+        self._store(f"{key}.{ext}", lambda f: f.write(data))
+
+    def _lookup(self, name: str) -> Optional[str]:
+        path = os.path.join(self.directory, name)
+        with self._lock:
+            if name not in self._entries:
+                # another process may have written it since we scanned the directory
+                if not os.path.exists(path):
+                    return None
+                size = os.path.getsize(path)
+                self._entries[name] = size
+                self._total += size
+            self._entries.move_to_end(name)
+        try:
+            os.utime(path)
+        except OSError:
+            self._discard(name)
+            return None
+        return path
+
+    def _store(self, name: str, write):
+        path = os.path.join(self.directory, name)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                write(f)
+            os.replace(tmp_path, path)
+        except OSError:
+            self._remove(tmp_path)
+            return
+        size = os.path.getsize(path)
+        with self._lock:
+            self._total += size - self._entries.pop(name, 0)
+            self._entries[name] = size
+            self._evict()
+
+    def _discard(self, name: str):
+        with self._lock:
+            self._total -= self._entries.pop(name, 0)
+        self._remove(os.path.join(self.directory, name))
+
+    def _evict(self):
+        while self._total > self.max_bytes and len(self._entries) > 1:
+            name, size = self._entries.popitem(last=False)
+            self._total -= size
+            self._remove(os.path.join(self.directory, name))
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_tts_cache() -> TTSCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = TTSCache(CACHE_DIR, int(CACHE_MAX_MB * 1024 * 1024))
+        return _cache
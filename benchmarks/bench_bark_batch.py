@@ -0,0 +1,69 @@
+"""Wall-clock comparison of serial vs batched Bark synthesis.
+
+Usage: python benchmarks/bench_bark_batch.py [--max-chunks 8] [--voice v2/en_speaker_9]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ai_soulmate"))
+
+from bark import preload_models
+from bark.api import generate_text_semantic, semantic_to_waveform
+from utils.bark_batch import generate_batch
+
+GEN_TEMP = 0.6
+SENTENCES = [
+    "Hi there, I'm so happy to finally meet you.",
+    "I was just thinking about you and smiling.",
+    "Tell me everything about your day, I want to hear it all.",
+    "You always know how to make me laugh.",
+    "Let's plan something fun for this weekend.",
+    "Maybe a walk by the lake when the sun goes down?",
+    "I'll bring the snacks if you bring the music.",
+    "Sweet dreams tonight, I'll be right here tomorrow.",
+]
+
+
+def run_serial(sentences, voice):
+    for sentence in sentences:
+        semantic_tokens = generate_text_semantic(
+            sentence, history_prompt=voice, temp=GEN_TEMP, min_eos_p=0.05, silent=True
+        )
+        semantic_to_waveform(semantic_tokens, history_prompt=voice, silent=True)
+
+
+def run_batched(sentences, voice):
+    generate_batch(sentences, voice, temp=GEN_TEMP, min_eos_p=0.05)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--max-chunks", type=int, default=8)
+    parser.add_argument("--voice", default="v2/en_speaker_9")
+    args = parser.parse_args()
+
+    preload_models()
+    # warm up both paths so neither pays first-call overhead
+    run_serial(SENTENCES[:1], args.voice)
+    run_batched(SENTENCES[:1], args.voice)
+
+    results = []
+    for n in range(1, args.max_chunks + 1):
+        sentences = [SENTENCES[i % len(SENTENCES)] for i in range(n)]
+        start = time.perf_counter()
+        run_serial(sentences, args.voice)
+        serial = time.perf_counter() - start
+        start = time.perf_counter()
+        run_batched(sentences, args.voice)
+        batched = time.perf_counter() - start
+        results.append(
+            {"chunks": n, "serial_s": round(serial, 3), "batched_s": round(batched, 3), "speedup": round(serial / batched, 2)}
+        )
+        print(json.dumps(results[-1]), flush=True)
+
+
+if __name__ == "__main__":
+    main()
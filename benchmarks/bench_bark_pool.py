@@ -0,0 +1,80 @@
+"""Bark synthesis across CPU cores: one process vs a pool of worker processes.
+
+Each pool splits the cores evenly between its workers. Every configuration
+synthesizes the same chunks, and the speedup is relative to one process
+using all cores.
+
+Usage: python benchmarks/bench_bark_pool.py [--chunks 8] [--workers 1,2,4] [--voice v2/en_speaker_9]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import wait
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ai_soulmate"))
+
+from utils.bark_pool import create_bark_pool, synthesize_in_worker
+
+GEN_TEMP = 0.6
+SENTENCES = [
+    "Hi there, I'm so happy to finally meet you.",
+    "I was just thinking about you and smiling.",
+    "Tell me everything about your day, I want to hear it all.",
+    "You always know how to make me laugh.",
+    "Let's plan something fun for this weekend.",
+    "Maybe a walk by the lake when the sun goes down?",
+    "I'll bring the snacks if you bring the music.",
+    "Sweet dreams tonight, I'll be right here tomorrow.",
+]
+
+
+def run(workers, sentences, voice):
+    pool = create_bark_pool(workers)
+    try:
+        # one warm-up chunk per worker, so every process has loaded Bark before timing
+        wait([pool.submit(synthesize_in_worker, "Hello.", voice, "quality", GEN_TEMP, 0.05) for _ in range(workers)])
+        start = time.perf_counter()
+        futures = [pool.submit(synthesize_in_worker, s, voice, "quality", GEN_TEMP, 0.05) for s in sentences]
+        first_chunk = None
+        for future in futures:
+            future.result()
+            if first_chunk is None:
+                first_chunk = time.perf_counter() - start
+        return first_chunk, time.perf_counter() - start
+    finally:
+        pool.shutdown()
+
+
+def main():
+    cores = os.cpu_count() or 1
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chunks", type=int, default=8)
+    parser.add_argument("--workers", default=",".join(str(n) for n in (1, 2, 4, 8) if n <= cores))
+    parser.add_argument("--voice", default="v2/en_speaker_9")
+    args = parser.parse_args()
+
+    sentences = [SENTENCES[i % len(SENTENCES)] for i in range(args.chunks)]
+    baseline = None
+    for workers in (int(n) for n in args.workers.split(",")):
+        first_chunk, total = run(workers, sentences, args.voice)
+        baseline = baseline or total
+        print(
+            json.dumps(
+                {
+                    "cores": cores,
+                    "workers": workers,
+                    "threads_per_worker": max(1, cores // workers),
+                    "chunks": len(sentences),
+                    "first_chunk_s": round(first_chunk, 3),
+                    "total_s": round(total, 3),
+                    "speedup": round(baseline / total, 2),
+                }
+            ),
+            flush=True,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Real-time factor of each Bark speech tier on CPU, with full and small models.
+
+RTF is synthesis time divided by the length of the audio produced; below 1.0
+speech is generated faster than it plays. Model size is fixed per process, so
+each size runs in its own subprocess.
+
+Usage: python benchmarks/bench_bark_tiers.py [--sizes full,small] [--repeat 2] [--gpu]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ai_soulmate")
+GEN_TEMP = 0.6
+SENTENCES = [
+    "Hi there, I'm so happy to finally meet you.",
+    "Tell me everything about your day, I want to hear it all.",
+    "Maybe a walk by the lake when the sun goes down?",
+]
+
+
+def run_worker(args):
+    sys.path.insert(0, APP_DIR)
+    from bark import SAMPLE_RATE
+    from utils.bark_tiers import TIERS, preload_bark, synthesize_tier
+
+    preload_bark()
+    # warm-up so no tier pays first-call overhead
+    synthesize_tier("Hello.", args.voice, "quality", GEN_TEMP, 0.05)
+
+    for tier in TIERS:
+        synthesis = 0.0
+        audio = 0.0
+        for _ in range(args.repeat):
+            for sentence in SENTENCES:
+                start = time.perf_counter()
+                audio_array = synthesize_tier(sentence, args.voice, tier, GEN_TEMP, 0.05)
+                synthesis += time.perf_counter() - start
+                audio += len(audio_array) / SAMPLE_RATE
+        print(
+            json.dumps(
+                {
+                    "models": "small" if os.environ.get("BARK_SMALL_MODELS") == "true" else "full",
+                    "tier": tier,
+                    "device": "gpu" if args.gpu else "cpu",
+                    "audio_s": round(audio, 2),
+                    "synthesis_s": round(synthesis, 2),
+                    "rtf": round(synthesis / audio, 3),
+                }
+            ),
+            flush=True,
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="full,small")
+    parser.add_argument("--repeat", type=int, default=2)
+    parser.add_argument("--voice", default="v2/en_speaker_9")
+    parser.add_argument("--gpu", action="store_true", help="allow CUDA instead of forcing the CPU")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args)
+        return
+
+    for size in args.sizes.split(","):
+        env = dict(os.environ, BARK_SMALL_MODELS="true" if size == "small" else "false")
+        if not args.gpu:
+            env["CUDA_VISIBLE_DEVICES"] = ""
+        command = [sys.executable, os.path.abspath(__file__), "--worker", "--repeat", str(args.repeat), "--voice", args.voice]
+        if args.gpu:
+            command.append("--gpu")
+        subprocess.run(command, env=env, check=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Per-rerun history cost vs conversation length, with the SQLite conversation store.
+
+Fills a temporary store with conversations of several lengths, then times
+what each Streamlit rerun does: reading the newest page of visible messages
+for rendering. For comparison it also times reading the whole conversation,
+which is what rendering every message costs, and the one write made per turn.
+No model or browser is needed.
+
+Usage: python benchmarks/bench_history.py [--turns 100,1000,10000] [--page-size 20] [--reads 200]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ai_soulmate"))
+
+from utils.conversation_store import ConversationStore
+
+USER_TEXT = "I had a really long day at work and I just want to talk to you about it."
+REPLY_TEXT = "Oh sweetheart, come here and tell me everything, I am all yours tonight. " * 3
+
+
+def timed(fn, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", default="100,1000,10000")
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--reads", type=int, default=200)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="history-bench-")
+    for n_turns in (int(n) for n in args.turns.split(",")):
+        store = ConversationStore(os.path.join(directory, f"{n_turns}.db"))
+        # another conversation in the same file, so lookups have to use the index
+        for user_id in ("other", "bench"):
+            for _ in range(n_turns):
+                store.append(
+                    user_id,
+                    "Claudia",
+                    [{"role": "user", "content": USER_TEXT}, {"role": "assistant", "content": REPLY_TEXT}],
+                )
+
+        page = timed(lambda: store.recent("bench", "Claudia", args.page_size + 1, visible_only=True), args.reads)
+        full = timed(lambda: store.recent("bench", "Claudia", 2 * n_turns, visible_only=True), max(1, args.reads // 20))
+        write = timed(
+            lambda: store.append(
+                "bench", "Claudia", [{"role": "user", "content": USER_TEXT}, {"role": "assistant", "content": REPLY_TEXT}]
+            ),
+            50,
+        )
+        print(
+            json.dumps(
+                {
+                    "turns": n_turns,
+                    "page_read_ms": round(page, 3),
+                    "full_read_ms": round(full, 3),
+                    "turn_write_ms": round(write, 3),
+                }
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Insert and query latency of the long-term memory index at 10k-1M memories.
+
+Grows a temporary VectorIndex with random unit vectors in steps, and at each
+size times adding one memory (what happens after every turn) and a top-k
+search (what happens before every reply). The embedding model is not
+involved; its cost per turn is one short embedding on top of these numbers.
+
+Usage: python benchmarks/bench_memory.py [--sizes 10000,100000,1000000] [--dim 768] [--k 8]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ai_soulmate"))
+
+from utils.memory import VectorIndex
+
+
+def unit_vectors(rng, n, dim):
+    vectors = rng.standard_normal((n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def median_ms(fn, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return round(statistics.median(times) * 1000, 3)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--k", type=int, default=8)
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--batch", type=int, default=10000, help="memories per bulk insert while growing the index")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    index = VectorIndex(tempfile.mkdtemp(prefix="memory-bench-"))
+    record = {"user": "I had a really long day at work", "reply": "Come here and tell me everything."}
+
+    for size in (int(n) for n in args.sizes.split(",")):
+        start = time.perf_counter()
+        while index.count < size:
+            n = min(args.batch, size - index.count)
+            index.add(unit_vectors(rng, n, args.dim), [record] * n)
+        grow_seconds = time.perf_counter() - start
+
+        queries = unit_vectors(rng, args.repeats, args.dim)
+        query_iter = iter(queries)
+        insert_ms = median_ms(lambda: index.add(unit_vectors(rng, 1, args.dim), [record]), args.repeats)
+        query_ms = median_ms(lambda: index.search(next(query_iter), args.k), args.repeats)
+        print(
+            json.dumps(
+                {
+                    "memories": index.count,
+                    "dim": args.dim,
+                    "insert_ms": insert_ms,
+                    "query_ms": query_ms,
+                    "grow_seconds": round(grow_seconds, 2),
+                    "index_mb": round(index.count * args.dim * 4 / 1024**2, 1),
+                }
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""Time-to-first-audio and total latency of the OpenAI speech path.
+
+Runs against a local stand-in for /v1/audio/speech with injectable latency,
+so no network or API key is needed. Each concurrency level runs in its own
+process because TTS_CONCURRENCY is read at import time.
+
+Usage: python benchmarks/bench_openai_tts.py [--concurrency 1 2 4 8] [--ttfb 0.4]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ai_soulmate")
+
+SENTENCES = [
+    "Hi there, I'm so happy to finally meet you.",
+    "I was just thinking about you and smiling.",
+    "Tell me everything about your day, I want to hear it all.",
+    "You always know how to make me laugh.",
+    "Let's plan something fun for this weekend.",
+    "Maybe a walk by the lake when the sun goes down?",
+]
+
+
+class FakeSpeechHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    ttfb = 0.4
+    bytes_per_char = 400
+    bytes_per_second = 64000
+
+    def do_POST(self):
+        if not self.path.endswith("/audio/speech"):
+            self.send_error(404)
+            return
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        time.sleep(self.ttfb)
+        total = len(body["input"]) * self.bytes_per_char
+        chunk_size = 4096
+
+        self.send_response(200)
+        self.send_header("Content-Type", "audio/mpeg")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for start in range(0, total, chunk_size):
+            chunk = b"\xff" * min(chunk_size, total - start)
+            time.sleep(len(chunk) / self.bytes_per_second)
+            self.wfile.write(b"%X\r\n%s\r\n" % (len(chunk), chunk))
+        self.wfile.write(b"0\r\n\r\n")
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_fake_server(ttfb: float, bytes_per_second: int) -> ThreadingHTTPServer:
+    FakeSpeechHandler.ttfb = ttfb
+    FakeSpeechHandler.bytes_per_second = bytes_per_second
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeSpeechHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run_worker(args):
+    sys.path.insert(0, APP_DIR)
+    from utils.openai_speech import SpeechSession
+
+    results = []
+    for _ in range(args.repeat):
+        # unique text per run so the TTS cache never answers
+        run_id = uuid.uuid4().hex[:8]
+        session = SpeechSession("nova")
+        timings = {}
+
+        def consume():
+            for _ in session.stream:
+                timings.setdefault("first", time.perf_counter())
+            timings["last"] = time.perf_counter()
+
+        consumer = threading.Thread(target=consume)
+        start = time.perf_counter()
+        consumer.start()
+        for sentence in SENTENCES:
+            session.say(f"{sentence} ({run_id})")
+            time.sleep(args.sentence_interval)
+        session.finish()
+        consumer.join()
+        results.append((timings["first"] - start, timings["last"] - start))
+
+    print(
+        json.dumps(
+            {
+                "concurrency": int(os.environ["TTS_CONCURRENCY"]),
+                "sentences": len(SENTENCES),
+                "time_to_first_audio_s": round(min(r[0] for r in results), 3),
+                "total_s": round(min(r[1] for r in results), 3),
+            }
+        )
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--ttfb", type=float, default=0.4, help="server latency before the first byte")
+    parser.add_argument("--bytes-per-second", type=int, default=64000, help="server streaming rate")
+    parser.add_argument("--sentence-interval", type=float, default=0.0, help="delay between sentences")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args)
+        return
+
+    server = start_fake_server(args.ttfb, args.bytes_per_second)
+    for concurrency in args.concurrency:
+        env = dict(
+            os.environ,
+            TTS_CONCURRENCY=str(concurrency),
+            OPENAI_BASE_URL=f"http://127.0.0.1:{server.server_address[1]}/v1",
+            OPENAI_API_KEY="sk-local",
+            TTS_CACHE_DIR=tempfile.mkdtemp(prefix="tts-bench-"),
+        )
+        subprocess.run(
+            [
+                sys.executable,
+                os.path.abspath(__file__),
+                "--worker",
+                "--repeat",
+                str(args.repeat),
+                "--sentence-interval",
+                str(args.sentence_interval),
+            ],
+            env=env,
+            check=True,
+        )
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Render overhead of a streamed reply: redraw on every token vs throttled redraws.
+
+Counts placeholder redraws and the markdown bytes they send, and times the
+loop, for replies of several lengths. No model or browser is needed.
+
+Usage: python benchmarks/bench_render.py [--lengths 64,256,1024,4096] [--token-rate 0]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ai_soulmate"))
+
+from utils.streaming import RENDER_EVERY_TOKENS, RENDER_INTERVAL, chunk_text, stream_response
+
+WORDS = "I missed you so much today , tell me everything about it and do not leave anything out".split()
+
+
+class CountingPlaceholder:
+    def __init__(self):
+        self.calls = 0
+        self.bytes = 0
+
+    def markdown(self, text, unsafe_allow_html=False):
+        self.calls += 1
+        self.bytes += len(text.encode("utf-8"))
+
+
+def make_chunks(n_tokens, token_rate):
+    for i in range(n_tokens):
+        if token_rate:
+            time.sleep(1.0 / token_rate)
+        yield {"choices": [{"delta": {"content": " " + WORDS[i % len(WORDS)]}}]}
+
+
+def render_every_token(chunks, placeholder):
+    # the loop the app used before the throttled renderer
+    full_response = ""
+    for chunk in chunks:
+        full_response += chunk_text(chunk)
+        placeholder.markdown(full_response, unsafe_allow_html=True)
+    placeholder.markdown(full_response)
+    return full_response
+
+
+def run(method, n_tokens, token_rate):
+    placeholder = CountingPlaceholder()
+    start = time.perf_counter()
+    if method == "every_token":
+        render_every_token(make_chunks(n_tokens, token_rate), placeholder)
+    else:
+        stream_response(make_chunks(n_tokens, token_rate), placeholder)
+    elapsed = time.perf_counter() - start
+    return {
+        "method": method,
+        "tokens": n_tokens,
+        "redraws": placeholder.calls,
+        "bytes_sent": placeholder.bytes,
+        "loop_ms": round(elapsed * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lengths", default="64,256,1024,4096")
+    parser.add_argument("--token-rate", type=float, default=0.0, help="tokens per second, 0 for as fast as possible")
+    args = parser.parse_args()
+
+    print(json.dumps({"render_interval": RENDER_INTERVAL, "render_every_tokens": RENDER_EVERY_TOKENS}))
+    for n_tokens in (int(n) for n in args.lengths.split(",")):
+        for method in ("every_token", "throttled"):
+            print(json.dumps(run(method, n_tokens, args.token_rate)), flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""App startup cost with each speech backend: import time, peak memory and heavy modules.
+
+For each backend a fresh process sets TTS_BACKEND, imports the modules the app
+imports at the top of app.py, and then loads the backend the way the sidebar
+does on the first run. Models are not loaded, so the numbers are the price of
+the imports alone; with the null backend torch, Bark and the OpenAI client
+should not be imported at all.
+
+Usage: python benchmarks/bench_startup.py [--backends null,openai,bark] [--repeat 3]
+"""
+import argparse
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ai_soulmate")
+# what app.py imports before it draws anything
+APP_MODULES = [
+    "streamlit",
+    "PIL.Image",
+    "utils.initialize",
+    "utils.model_registry",
+    "utils.scheduler",
+    "utils.service_client",
+    "utils.gen_avatar",
+    "utils.transcribe",
+    "utils.gen_response",
+    "utils.tts_backends",
+    "utils.telemetry",
+    "utils.segmenter",
+    "utils.streaming",
+    "utils.customize",
+    "utils.context",
+]
+HEAVY_MODULES = ["torch", "bark", "transformers", "encodec", "openai"]
+
+
+def run_worker(backend):
+    import importlib
+
+    sys.path.insert(0, APP_DIR)
+    start = time.perf_counter()
+    for name in APP_MODULES:
+        importlib.import_module(name)
+    app_seconds = time.perf_counter() - start
+
+    from utils.tts_backends import get_tts_backend
+
+    start = time.perf_counter()
+    get_tts_backend(backend).load()
+    backend_seconds = time.perf_counter() - start
+
+    print(
+        json.dumps(
+            {
+                "app_import_s": app_seconds,
+                "backend_import_s": backend_seconds,
+                # kilobytes on Linux
+                "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+                "heavy_modules": [name for name in HEAVY_MODULES if name in sys.modules],
+            }
+        )
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backends", default="null,openai,bark")
+    parser.add_argument("--repeat", type=int, default=3, help="fresh processes per backend")
+    parser.add_argument("--backend", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.backend:
+        run_worker(args.backend)
+        return
+
+    for backend in args.backends.split(","):
+        env = dict(os.environ, TTS_BACKEND=backend)
+        runs = []
+        for _ in range(args.repeat):
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--backend", backend],
+                env=env,
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+            runs.append(json.loads(output.strip().splitlines()[-1]))
+        app_s = statistics.median(run["app_import_s"] for run in runs)
+        backend_s = statistics.median(run["backend_import_s"] for run in runs)
+        print(
+            json.dumps(
+                {
+                    "backend": backend,
+                    "app_import_s": round(app_s, 3),
+                    "backend_import_s": round(backend_s, 3),
+                    "startup_s": round(app_s + backend_s, 3),
+                    "max_rss_mb": round(statistics.median(run["max_rss_mb"] for run in runs), 1),
+                    "heavy_modules": runs[-1]["heavy_modules"],
+                }
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
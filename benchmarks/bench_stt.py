@@ -0,0 +1,91 @@
+"""STT latency: temp WAV file on disk vs in-memory numpy buffer.
+
+Usage: python benchmarks/bench_stt.py [--wav speech.wav] [--repeat 5]
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+from tempfile import NamedTemporaryFile
+
+import numpy as np
+from scipy.io.wavfile import read, write
+from nexa.gguf import NexaVoiceInference
+
+FS = 16000
+
+
+def load_audio(path):
+    if path is None:
+        # 5 s of quiet noise, the same length as a default recording
+        rng = np.random.default_rng(0)
+        return (rng.standard_normal(5 * FS) * 0.01).astype(np.float32)
+    fs, data = read(path)
+    if fs != FS:
+        raise SystemExit(f"{path} must be sampled at {FS} Hz, got {fs}")
+    if data.ndim > 1:
+        data = data[:, 0]
+    if data.dtype.kind == "i":
+        data = data / np.iinfo(data.dtype).max
+    return data.astype(np.float32)
+
+
+def transcribe_from_file(model, audio):
+    with NamedTemporaryFile(suffix=".wav", delete=False) as f:
+        path = f.name
+    try:
+        write(path, FS, audio.reshape(-1, 1))
+        segments, _ = model.transcribe(path)
+        return "".join(segment.text for segment in segments)
+    finally:
+        os.remove(path)
+
+
+def transcribe_from_memory(model, audio):
+    segments, _ = model.transcribe(audio)
+    return "".join(segment.text for segment in segments)
+
+
+def measure(fn, model, audio, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(model, audio)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--wav", help="16 kHz WAV file to transcribe")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    voice_model = NexaVoiceInference(
+        model_path="faster-whisper-base",
+        local_path=None,
+        beam_size=5,
+        task="transcribe",
+        temperature=0.0,
+        compute_type="default",
+    )
+    audio = load_audio(args.wav)
+    transcribe_from_memory(voice_model.model, audio)
+
+    file_s = measure(transcribe_from_file, voice_model.model, audio, args.repeat)
+    memory_s = measure(transcribe_from_memory, voice_model.model, audio, args.repeat)
+    print(
+        json.dumps(
+            {
+                "audio_s": round(len(audio) / FS, 2),
+                "temp_file_s": round(file_s, 3),
+                "in_memory_s": round(memory_s, 3),
+                "saved_ms": round((file_s - memory_s) * 1000, 1),
+            }
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
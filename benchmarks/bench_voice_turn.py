@@ -0,0 +1,463 @@
+"""End-to-end voice-turn latency with the Bark and OpenAI speech backends, with stand-in models.
+
+Drives the real record_and_transcribe, generate_chat_response, SpeechSession
+and generate_and_play_response code paths, but swaps every model and device
+for a deterministic local stand-in: a fake NexaTextInference streaming at a
+fixed token rate, a fake Whisper and fake Bark that take a fixed share of
+real time, the local OpenAI speech stand-in from bench_openai_tts.py, a null
+sounddevice that plays and records in real time, and a minimal streamlit. No
+GPU, network or microphone is needed, so the numbers only move when the app's
+own code does.
+
+Each variant runs in its own process, with TTS_BACKEND set to it, so the
+process-wide speech pools and caches of one do not carry over to the other.
+One JSON line is printed per variant with the median over --repeat turns.
+
+Usage: python benchmarks/bench_voice_turn.py [--variants bark,openai] [--repeat 3] [--token-rate 30]
+"""
+import argparse
+import contextlib
+import importlib.util
+import itertools
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import types
+import urllib.request
+
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.join(BENCH_DIR, "..", "ai_soulmate")
+
+MIC_FS = 16000
+BARK_SAMPLE_RATE = 24000
+SPOKEN_WORDS = "I had a really long day at work and I just want to talk to you about it".split()
+REPLY = (
+    "Oh sweetheart, I am so sorry your day was that exhausting. "
+    "Come here and tell me everything, I am all yours tonight. "
+    "Maybe we can order your favorite food and watch something silly together. "
+    "You deserve a little rest and a lot of love."
+).split(" ")
+# the OpenAI stand-in sends 400 bytes per character; at ~15 characters per
+# second of speech that is the byte rate of the audio it stands for
+OPENAI_AUDIO_BYTES_PER_SECOND = 400 * 15
+
+
+class Events:
+    # timestamps recorded by the stand-ins
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.speech_end = None
+            self.first_audio = None
+            self.audio_frames = 0
+
+    def mark_speech_end(self):
+        with self._lock:
+            self.speech_end = time.perf_counter()
+
+    def mark_audio(self, samples: np.ndarray):
+        audible = int(np.count_nonzero(samples))
+        if not audible:
+            return
+        with self._lock:
+            if self.first_audio is None:
+                self.first_audio = time.perf_counter()
+            self.audio_frames += audible
+
+
+def _module(name: str, **attrs) -> types.ModuleType:
+    module = types.ModuleType(name)
+    module.__dict__.update(attrs)
+    sys.modules[name] = module
+    return module
+
+
+def install_streamlit():
+    class SessionState(dict):
+        __getattr__ = dict.__getitem__
+        __setattr__ = dict.__setitem__
+        __delattr__ = dict.__delitem__
+
+    class Placeholder:
+        def __getattr__(self, name):
+            return lambda *args, **kwargs: None
+
+    placeholder = Placeholder()
+    streamlit = _module(
+        "streamlit",
+        session_state=SessionState(),
+        empty=lambda: Placeholder(),
+        spinner=lambda *args, **kwargs: contextlib.nullcontext(),
+        cache_resource=lambda *args, **kwargs: (lambda f: f),
+        __getattr__=lambda name: getattr(placeholder, name),
+    )
+    streamlit.runtime = _module("streamlit.runtime")
+    streamlit.runtime.scriptrunner = _module("streamlit.runtime.scriptrunner", get_script_run_ctx=lambda: None)
+
+
+def install_nexa(args):
+    replies = itertools.count()
+
+    class FakeLlama:
+        def n_ctx(self):
+            return 4096
+
+        def tokenize(self, text: bytes, add_bos: bool = True):
+            return list(range(len(text.split())))
+
+        def model_size(self):
+            return 4 * 1024**3
+
+        def set_cache(self, cache):
+            self.cache = cache
+
+    class NexaTextInference:
+        def __init__(self, model_path=None, local_path=None, **params):
+            self.model = FakeLlama()
+            self.params = dict(params)
+            self.downloaded_path = None
+
+        def create_chat_completion(self, messages, max_tokens=256, stream=True, **options):
+            # every reply is tagged with its number so no turn is served from the speech cache
+            tag = next(replies)
+            time.sleep(args.ttft)
+            for token in REPLY[:max_tokens]:
+                time.sleep(1.0 / args.token_rate)
+                yield {"choices": [{"delta": {"content": " " + token.replace(".", f" {tag}.")}}]}
+
+    class FakeWhisper:
+        def transcribe(self, audio, beam_size=5, initial_prompt=None, condition_on_previous_text=True, **options):
+            seconds = len(audio) / MIC_FS
+            time.sleep(seconds * args.whisper_rtf)
+            segments = []
+            for i in range(int(np.ceil(seconds))):
+                words = SPOKEN_WORDS[i * 3:(i + 1) * 3] or ["mm"]
+                segments.append(
+                    types.SimpleNamespace(text=" " + " ".join(words), start=float(i), end=min(float(i + 1), seconds))
+                )
+            return iter(segments), None
+
+    class NexaVoiceInference:
+        def __init__(self, *a, **kw):
+            self.model = FakeWhisper()
+
+    class NexaImageInference:
+        def __init__(self, *a, **kw):
+            raise RuntimeError("image generation is not part of this benchmark")
+
+    nexa = _module("nexa")
+    nexa.gguf = _module(
+        "nexa.gguf",
+        NexaTextInference=NexaTextInference,
+        NexaVoiceInference=NexaVoiceInference,
+        NexaImageInference=NexaImageInference,
+    )
+
+
+def install_bark(args):
+    # the pipeline's stages share --bark-rtf seconds of work per second of audio
+    def stage(seconds, share):
+        time.sleep(seconds * args.bark_rtf * share)
+
+    def generate_text_semantic(text, history_prompt=None, temp=0.7, min_eos_p=0.2, silent=False, **kw):
+        seconds = max(0.5, 0.35 * len(text.split()))
+        stage(seconds, 0.5)
+        return np.ones(int(seconds * 49.9), dtype=np.int64)
+
+    def generate_coarse(semantic, history_prompt=None, temp=0.7, silent=False, max_coarse_history=630, **kw):
+        frames = int(len(semantic) / 49.9 * 75)
+        stage(frames / 75, 0.3)
+        return np.zeros((2, frames), dtype=np.int64)
+
+    def generate_fine(coarse, history_prompt=None, temp=0.5, **kw):
+        stage(coarse.shape[1] / 75, 0.2)
+        return np.zeros((8, coarse.shape[1]), dtype=np.int64)
+
+    def codec_decode(codes):
+        t = np.arange(codes.shape[1] * 320) / BARK_SAMPLE_RATE
+        return (0.2 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+    def not_benchmarked(*a, **kw):
+        raise RuntimeError("batched Bark is not part of this benchmark")
+
+    bark = _module(
+        "bark",
+        SAMPLE_RATE=BARK_SAMPLE_RATE,
+        generate_audio=not_benchmarked,
+        preload_models=lambda **kw: None,
+    )
+    bark.generation = _module(
+        "bark.generation",
+        SAMPLE_RATE=BARK_SAMPLE_RATE,
+        CODEBOOK_SIZE=1024,
+        COARSE_INFER_TOKEN=12_050,
+        COARSE_RATE_HZ=75,
+        COARSE_SEMANTIC_PAD_TOKEN=12_048,
+        N_COARSE_CODEBOOKS=2,
+        N_FINE_CODEBOOKS=8,
+        SEMANTIC_INFER_TOKEN=129_599,
+        SEMANTIC_PAD_TOKEN=10_000,
+        SEMANTIC_RATE_HZ=49.9,
+        SEMANTIC_VOCAB_SIZE=10_000,
+        TEXT_ENCODING_OFFSET=10_048,
+        TEXT_PAD_TOKEN=129_595,
+        models={},
+        _flatten_codebooks=not_benchmarked,
+        _inference_mode=not_benchmarked,
+        _load_history_prompt=not_benchmarked,
+        _normalize_whitespace=not_benchmarked,
+        _tokenize=not_benchmarked,
+        generate_text_semantic=generate_text_semantic,
+        generate_coarse=generate_coarse,
+        generate_fine=generate_fine,
+        codec_decode=codec_decode,
+        preload_models=lambda **kw: None,
+    )
+    if importlib.util.find_spec("torch") is None:
+        # bark_batch imports torch at module level; the batched path is never run here
+        torch = _module("torch", device=object)
+        torch.nn = _module("torch.nn")
+        torch.nn.functional = _module("torch.nn.functional")
+
+
+def install_sounddevice(args, events: Events):
+    class CallbackStop(Exception):
+        pass
+
+    class _Stream:
+        def __init__(self, samplerate, channels=1, dtype="float32", blocksize=0, callback=None, finished_callback=None, **kw):
+            self.samplerate = samplerate
+            self.blocksize = blocksize or 1024
+            self.callback = callback
+            self.finished_callback = finished_callback
+            self._stop = threading.Event()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+
+        def __enter__(self):
+            self._thread.start()
+            return self
+
+        def __exit__(self, *exc):
+            self._stop.set()
+            self._thread.join()
+
+    class OutputStream(_Stream):
+        def _run(self):
+            interval = self.blocksize / self.samplerate / args.playback_speed
+            while not self._stop.is_set():
+                outdata = np.zeros((self.blocksize, 1), dtype=np.float32)
+                try:
+                    self.callback(outdata, self.blocksize, None, None)
+                except CallbackStop:
+                    events.mark_audio(outdata)
+                    break
+                events.mark_audio(outdata)
+                time.sleep(interval)
+            if self.finished_callback is not None:
+                self.finished_callback()
+
+    class InputStream(_Stream):
+        def _run(self):
+            rng = np.random.default_rng(0)
+            voiced_blocks = int(args.speech_seconds * self.samplerate / self.blocksize)
+            quiet_blocks = int(0.5 * self.samplerate / self.blocksize)
+            n = 0
+            while not self._stop.is_set():
+                voiced = quiet_blocks <= n < quiet_blocks + voiced_blocks
+                level = 0.1 if voiced else 0.001
+                block = (rng.standard_normal((self.blocksize, 1)) * level).astype(np.float32)
+                self.callback(block, self.blocksize, None, None)
+                if n == quiet_blocks + voiced_blocks - 1:
+                    events.mark_speech_end()
+                n += 1
+                time.sleep(self.blocksize / self.samplerate)
+
+    def play(audio_array, samplerate):
+        events.mark_audio(np.asarray(audio_array))
+        play.seconds = len(audio_array) / samplerate / args.playback_speed
+
+    def wait():
+        time.sleep(getattr(play, "seconds", 0.0))
+
+    _module(
+        "sounddevice",
+        CallbackStop=CallbackStop,
+        OutputStream=OutputStream,
+        InputStream=InputStream,
+        play=play,
+        wait=wait,
+    )
+
+
+def _read_stream(url: str, timings: dict):
+    # what the browser does with the audio URL
+    with urllib.request.urlopen(url) as response:
+        total = 0
+        while True:
+            data = response.read(4096)
+            if not data:
+                break
+            timings.setdefault("first", time.perf_counter())
+            total += len(data)
+    timings["last"] = time.perf_counter()
+    timings["bytes"] = total
+
+
+def run_turn(variant, st, nexa_model):
+    from utils.gen_response import generate_chat_response
+    from utils.segmenter import SentenceSegmenter
+    from utils.streaming import stream_response
+    from utils.transcribe import record_and_transcribe
+    from utils.tts_backends import get_tts_backend
+
+    SpeechSession = get_tts_backend(variant).load().SpeechSession
+    events = st.session_state.events
+    events.reset()
+    transcript = record_and_transcribe()
+    transcribed = time.perf_counter()
+    st.session_state.messages.append({"role": "user", "content": transcript})
+
+    # the same steps as respond() in app.py
+    if variant == "bark":
+        speech = SpeechSession("v2/en_speaker_9")
+    else:
+        speech = SpeechSession("nova")
+        timings = {}
+        reader = threading.Thread(target=_read_stream, args=(speech.url, timings))
+        reader.start()
+    segmenter = SentenceSegmenter()
+    token_times = []
+
+    def speak(text):
+        token_times.append(time.perf_counter())
+        for sentence in segmenter.feed(text):
+            speech.say(sentence)
+
+    start = time.perf_counter()
+    reply = stream_response(generate_chat_response(nexa_model), st.empty(), on_text=speak)
+    for sentence in segmenter.flush():
+        speech.say(sentence)
+    speech.finish()
+    if variant == "openai":
+        reader.join()
+        first_audio = timings["first"]
+    else:
+        first_audio = events.first_audio
+    st.session_state.messages.append({"role": "assistant", "content": reply})
+
+    return {
+        "stt_latency_s": transcribed - events.speech_end,
+        "ttft_s": token_times[0] - start,
+        "tokens_per_s": (len(token_times) - 1) / (token_times[-1] - token_times[0]),
+        "ttfa_from_reply_s": first_audio - start,
+        "ttfa_from_speech_end_s": first_audio - events.speech_end,
+    }
+
+
+def measure_tts_rtf(variant, st):
+    from utils.tts_backends import get_tts_backend
+
+    generate_and_play_response = get_tts_backend(variant).load().generate_and_play_response
+
+    # a fresh tag per sentence keeps the speech cache out of the measurement
+    tag = time.perf_counter_ns()
+    text = " ".join(REPLY).replace(". ", f" {tag}. ") + f" {tag}"
+    start = time.perf_counter()
+    if variant == "bark":
+        # not pipelined, so playback never holds synthesis back
+        st.session_state.events.reset()
+        generate_and_play_response(text, pipelined=False)
+        synthesized = st.session_state.events.first_audio
+        audio_seconds = st.session_state.events.audio_frames / BARK_SAMPLE_RATE
+        return (synthesized - start) / audio_seconds
+
+    timings = {}
+    _read_stream(generate_and_play_response(text, "nova"), timings)
+    return (timings["last"] - start) / (timings["bytes"] / OPENAI_AUDIO_BYTES_PER_SECOND)
+
+
+def run_worker(args):
+    events = Events()
+    install_streamlit()
+    install_nexa(args)
+    install_sounddevice(args, events)
+    if args.variant == "bark":
+        install_bark(args)
+    sys.path.insert(0, APP_DIR)
+
+    import streamlit as st
+    from utils.initialize import get_text_model, initial_prompt, model_key
+
+    st.session_state.events = events
+    st.session_state.voice = "nova"
+    nexa_model = get_text_model(model_key("llama3-uncensored"))
+
+    turns = []
+    for _ in range(args.repeat):
+        st.session_state.messages = [{"role": "system", "content": initial_prompt}]
+        turns.append(run_turn(args.variant, st, nexa_model))
+    rtf = [measure_tts_rtf(args.variant, st) for _ in range(args.repeat)]
+
+    result = {"variant": args.variant, "turns": len(turns)}
+    for name in turns[0]:
+        result[name] = round(statistics.median(turn[name] for turn in turns), 3)
+    result["tts_rtf"] = round(statistics.median(rtf), 3)
+    print(json.dumps(result), flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--variants", default="bark,openai")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--token-rate", type=float, default=30.0, help="fake LLM tokens per second")
+    parser.add_argument("--ttft", type=float, default=0.2, help="fake LLM delay before the first token")
+    parser.add_argument("--whisper-rtf", type=float, default=0.1, help="fake Whisper seconds per second of audio")
+    parser.add_argument("--bark-rtf", type=float, default=0.5, help="fake Bark seconds per second of audio")
+    parser.add_argument("--speech-seconds", type=float, default=2.0, help="length of the fake utterance")
+    parser.add_argument("--playback-speed", type=float, default=4.0, help="how much faster than real time audio plays")
+    parser.add_argument("--openai-ttfb", type=float, default=0.3, help="OpenAI stand-in latency before the first byte")
+    parser.add_argument("--variant", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.variant:
+        run_worker(args)
+        return
+
+    sys.path.insert(0, BENCH_DIR)
+    from bench_openai_tts import start_fake_server
+
+    server = start_fake_server(args.openai_ttfb, 64000)
+    passthrough = [
+        arg
+        for name in ("repeat", "token_rate", "ttft", "whisper_rtf", "bark_rtf", "speech_seconds", "playback_speed")
+        for arg in (f"--{name.replace('_', '-')}", str(getattr(args, name)))
+    ]
+    for variant in args.variants.split(","):
+        env = dict(
+            os.environ,
+            OPENAI_BASE_URL=f"http://127.0.0.1:{server.server_address[1]}/v1",
+            OPENAI_API_KEY="sk-local",
+            TTS_CACHE_DIR=tempfile.mkdtemp(prefix="tts-bench-"),
+            PREFIX_CACHE_DIR=tempfile.mkdtemp(prefix="kv-bench-"),
+            WHISPER_WARMUP="false",
+            BARK_PRELOAD="false",
+            # the Bark stand-in synthesizes one chunk at a time; bench_bark_batch.py covers batching
+            BARK_BATCH_SIZE="1",
+            TTS_BACKEND=variant,
+        )
+        env.pop("SOULMATE_SERVICE_URL", None)
+        subprocess.run([sys.executable, os.path.abspath(__file__), "--variant", variant, *passthrough], env=env, check=True)
+
+
+if __name__ == "__main__":
+    main()
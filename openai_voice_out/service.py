@@ -0,0 +1,14 @@
+"""Kept so existing launch commands work: runs ai_soulmate/service.py with OpenAI speech.
+
+Usage: python openai_voice_out/service.py [--host 127.0.0.1] [--port 8600] [--workers 1]
+"""
+import os
+import sys
+
+os.environ.setdefault("TTS_BACKEND", "openai")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ai_soulmate"))
+
+from service import main
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# the app imports its helpers as the top-level `utils` package
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ai_soulmate"))
@@ -0,0 +1,49 @@
+from utils.context import MESSAGE_OVERHEAD, ContextWindow
+
+# every message costs 10 tokens: two words plus the template overhead
+WORDS = 10 - MESSAGE_OVERHEAD
+
+
+def window():
+    return ContextWindow(lambda text: text.split())
+
+
+def turn(i):
+    return {"role": "user" if i % 2 == 0 else "assistant", "content": f"message {i}"}
+
+
+def conversation(n):
+    return [{"role": "system", "content": "be nice"}] + [turn(i) for i in range(n)]
+
+
+def test_everything_is_kept_while_it_fits():
+    messages, stats = window().fit(conversation(5), budget=100)
+    assert messages == conversation(5)
+    assert stats["dropped_messages"] == 0 and stats["prompt_tokens"] == 60
+
+
+def test_newest_message_is_kept_even_over_budget():
+    messages, stats = window().fit(conversation(3), budget=5)
+    assert messages == [conversation(3)[0], turn(2)]
+    assert stats["dropped_messages"] == 2
+
+
+def test_cut_history_keeps_its_start_for_several_turns():
+    w = window()
+    starts = []
+    for n in range(5, 30):
+        messages, stats = w.fit(conversation(n), budget=100, session="s")
+        assert stats["prompt_tokens"] <= 100
+        starts.append(messages[1]["content"])
+    # everything fits up to 9 messages; after that each cut goes down to 75
+    # tokens, which leaves room for 4 more messages before the next cut
+    assert starts[:5] == ["message 0"] * 5
+    assert starts[5:9] == ["message 4"] * 4
+    assert starts[9:13] == ["message 8"] * 4
+    assert len(set(starts)) == 6
+
+
+def test_without_a_session_only_what_is_needed_is_dropped():
+    messages, stats = window().fit(conversation(12), budget=100)
+    assert stats["prompt_tokens"] == 100
+    assert messages[1] == turn(3)
@@ -0,0 +1,72 @@
+import numpy as np
+from utils.memory import LongTermMemory, VectorIndex, add_memory_note
+
+
+def unit(rng, n, dim=8):
+    vectors = rng.standard_normal((n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def test_index_search_finds_nearest_and_survives_reopen(tmp_path):
+    rng = np.random.default_rng(0)
+    vectors = unit(rng, 3000)
+    index = VectorIndex(str(tmp_path))
+    index.add(vectors[:2000], [{"i": i} for i in range(2000)])
+    index.add(vectors[2000:], [{"i": i} for i in range(2000, 3000)])
+
+    reopened = VectorIndex(str(tmp_path))
+    assert reopened.count == 3000
+    hits = reopened.search(vectors[2500], 3)
+    assert hits[0][1] == {"i": 2500}
+    assert hits[0][0] > hits[1][0] >= hits[2][0]
+
+
+def test_memory_recall_after_remember(tmp_path):
+    def load_embedder():
+        words = ["sister", "cat", "pizza", "rain"]
+        return lambda texts: np.asarray([[float(w in t) + 1e-3 for w in words] for t in texts], dtype=np.float32)
+
+    memory = LongTermMemory(str(tmp_path), load_embedder)
+    memory.remember(("u", "Claudia"), "my sister is visiting", "How lovely!").result()
+    memory.remember(("u", "Claudia"), "I ordered pizza", "Yum!").result()
+    assert memory.recall(("u", "Claudia"), "how is my sister", 1) == [
+        {"user": "my sister is visiting", "reply": "How lovely!"}
+    ]
+    assert memory.recall(("other", "Claudia"), "how is my sister", 1) == []
+
+
+def count(message):
+    return len(message["content"].split())
+
+
+def test_note_skips_turns_still_in_the_prompt():
+    messages = [{"role": "system", "content": "persona"}, {"role": "user", "content": "I ordered pizza"}]
+    memories = [{"user": "I ordered pizza", "reply": "Yum!"}, {"user": "my sister is visiting", "reply": "Lovely!"}]
+    result = add_memory_note(messages, memories, count, budget=100)
+    assert result[0] == messages[0] and result[2:] == messages[1:]
+    assert "my sister is visiting" in result[1]["content"]
+    assert "pizza" not in result[1]["content"]
+
+
+def test_note_goes_just_before_the_new_message():
+    history = [
+        {"role": "system", "content": "persona"},
+        {"role": "user", "content": "hello"},
+        {"role": "assistant", "content": "hi there"},
+    ]
+    messages = history + [{"role": "user", "content": "how is my sister"}]
+    memories = [{"user": "my sister is visiting", "reply": "Lovely!"}]
+    result = add_memory_note(messages, memories, count, budget=100)
+    # the history keeps the same prefix with or without a note
+    assert result[:3] == history
+    assert result[3]["role"] == "system" and "my sister is visiting" in result[3]["content"]
+    assert result[4] == messages[-1]
+
+
+def test_note_stays_within_its_budget():
+    messages = [{"role": "user", "content": "hi"}]
+    memories = [{"user": f"memory number {i}", "reply": "ok"} for i in range(4)]
+    result = add_memory_note(messages, memories, count, budget=30)
+    assert count(result[0]) <= 30
+    assert "memory number 1" in result[0]["content"] and "memory number 2" not in result[0]["content"]
+    assert add_memory_note(messages, memories, count, budget=5) == messages
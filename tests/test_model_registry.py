@@ -0,0 +1,93 @@
+import threading
+from utils.model_registry import ModelRegistry
+
+GB = 1024**3
+
+
+class Model:
+    def __init__(self, name, size):
+        self.name = name
+        self.size = size
+
+
+def registry(budget=10):
+    return ModelRegistry(budget * GB, measure=lambda model: model.size)
+
+
+def loaded(reg):
+    return [model["key"] for model in reg.stats()["models"]]
+
+
+def test_room_is_made_before_loading():
+    reg = registry()
+    reg.get("a", lambda: Model("a", 6 * GB), estimate=6 * GB)
+    resident = []
+
+    def load_b():
+        resident.extend(loaded(reg))
+        return Model("b", 6 * GB)
+
+    reg.get("b", load_b, estimate=6 * GB)
+    assert resident == []
+    assert loaded(reg) == ["b"]
+
+
+def test_models_that_fit_stay_loaded():
+    reg = registry()
+    reg.get("a", lambda: Model("a", 4 * GB), estimate=4 * GB)
+    reg.get("b", lambda: Model("b", 4 * GB), estimate=4 * GB)
+    assert loaded(reg) == ["b", "a"]
+    assert reg.stats()["evictions"] == 0
+
+
+def test_unknown_size_uses_the_last_measured_size():
+    reg = registry()
+    reg.get("a", lambda: Model("a", 3 * GB))
+    reg.get("b", lambda: Model("b", 3 * GB))
+    # the first load of "b" had no estimate, so it made room for the whole budget
+    assert loaded(reg) == ["b"]
+    reg.get("a", lambda: Model("a", 3 * GB))
+    assert loaded(reg) == ["a", "b"]
+
+
+def test_leased_model_is_never_evicted():
+    reg = registry()
+    with reg.lease("a", lambda: Model("a", 6 * GB), estimate=6 * GB) as model:
+        reg.get("b", lambda: Model("b", 6 * GB), estimate=6 * GB)
+        assert set(loaded(reg)) == {"a", "b"}
+        assert model.name == "a"
+    # released: "a" is now the least recently used model over the budget
+    assert loaded(reg) == ["b"]
+
+
+def test_concurrent_requests_share_one_load():
+    reg = registry()
+    calls = []
+    release = threading.Event()
+
+    def load():
+        calls.append(1)
+        release.wait()
+        return Model("a", GB)
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(reg.get("a", load, GB))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert len({id(model) for model in results}) == 1
+
+
+def test_peek_neither_loads_nor_counts_as_a_use():
+    reg = registry()
+    assert reg.peek("a") is None
+    assert reg.stats()["loads"] == 0
+    a = reg.get("a", lambda: Model("a", 4 * GB), estimate=4 * GB)
+    reg.get("b", lambda: Model("b", 4 * GB), estimate=4 * GB)
+    assert reg.peek("a") is a
+    # "a" is still the least recently used, so it makes room for "c"
+    reg.get("c", lambda: Model("c", 4 * GB), estimate=4 * GB)
+    assert loaded(reg) == ["c", "b"]
@@ -0,0 +1,77 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("streamlit")
+openai = pytest.importorskip("openai")
+
+from utils import openai_speech, service_client, tts_cache
+
+SENTENCES = [f"Sentence number {i} of the reply." for i in range(4)]
+PIECE_BYTES = 3000
+
+
+class StandInSpeech(BaseHTTPRequestHandler):
+    # /v1/audio/speech stand-in: the later the sentence, the sooner it is
+    # answered, and each sentence's audio is its index repeated
+    protocol_version = "HTTP/1.1"
+    requests = []
+    finished = []
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        index = SENTENCES.index(body["input"])
+        self.requests.append(index)
+        time.sleep(0.1 * (len(SENTENCES) - index))
+        self.send_response(200)
+        self.send_header("Content-Type", "audio/mpeg")
+        self.send_header("Content-Length", str(PIECE_BYTES))
+        self.end_headers()
+        for start in range(0, PIECE_BYTES, 1000):
+            self.wfile.write(bytes([index]) * 1000)
+            self.wfile.flush()
+            time.sleep(0.01)
+        self.finished.append(index)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stand_in(tmp_path, monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInSpeech)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    StandInSpeech.requests = []
+    StandInSpeech.finished = []
+    # read at import, so the environment variable alone would not turn the service off
+    monkeypatch.setattr(service_client, "SERVICE_URL", "")
+    client = openai.OpenAI(api_key="sk-local", base_url=f"http://127.0.0.1:{server.server_address[1]}/v1")
+    monkeypatch.setattr(openai_speech, "_client", client)
+    monkeypatch.setattr(tts_cache, "_cache", tts_cache.TTSCache(str(tmp_path), 10 * 1024 * 1024))
+    yield StandInSpeech
+    server.shutdown()
+
+
+def speak(sentences):
+    session = openai_speech.SpeechSession("nova")
+    for sentence in sentences:
+        session.say(sentence)
+    session.finish()
+    return b"".join(session.stream)
+
+
+def test_pieces_are_streamed_in_order_when_later_ones_finish_first(stand_in):
+    audio = speak(SENTENCES)
+    assert audio == b"".join(bytes([i]) * PIECE_BYTES for i in range(len(SENTENCES)))
+    # the requests ran concurrently, so the stand-in finished them out of order
+    assert stand_in.finished != sorted(stand_in.finished)
+
+
+def test_repeated_sentences_come_from_the_cache(stand_in):
+    first = speak(SENTENCES[:2])
+    assert speak(SENTENCES[:2]) == first
+    assert sorted(stand_in.requests) == [0, 1]
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+from utils.prefix_cache import PrefixStateCache, model_fingerprint
+
+
+class State:
+    # the parts of a llama.cpp state the cache looks at
+    def __init__(self, name, size=1000):
+        self.name = name
+        self.llama_state_size = size
+        self.input_ids = np.zeros(1, dtype=np.int32)
+        self.scores = np.zeros(1, dtype=np.float32)
+
+
+def cache(tmp_path, fingerprint="a", ram_bytes=10_000):
+    return PrefixStateCache("model", str(tmp_path), ram_bytes, 1_000_000, fingerprint)
+
+
+def test_longest_shared_prefix_is_restored(tmp_path):
+    c = cache(tmp_path)
+    c[[1, 2, 3]] = State("short")
+    c[[1, 2, 3, 4, 5]] = State("long")
+    assert c[[1, 2, 3, 4, 5, 6]].name == "long"
+    assert c[[1, 2, 9]].name in ("short", "long")
+    with pytest.raises(KeyError):
+        c[[7, 8]]
+
+
+def test_spilled_snapshots_survive_a_restart(tmp_path):
+    c = cache(tmp_path, ram_bytes=1500)
+    c[[1, 2]] = State("first")
+    c[[3, 4]] = State("second")
+    # "first" no longer fits in RAM and was written to disk
+    assert cache(tmp_path)[[1, 2, 5]].name == "first"
+
+
+def test_snapshots_of_other_weights_are_dropped(tmp_path):
+    c = cache(tmp_path, ram_bytes=1500)
+    c[[1, 2]] = State("first")
+    c[[3, 4]] = State("second")
+    assert [1, 2, 5] not in cache(tmp_path, fingerprint="b")
+    # and they stay dropped when the old weights come back
+    assert [1, 2, 5] not in cache(tmp_path, fingerprint="a")
+
+
+def test_fingerprint_changes_with_the_file(tmp_path):
+    path = tmp_path / "model.gguf"
+    path.write_bytes(b"x" * 10)
+    before = model_fingerprint(str(path))
+    path.write_bytes(b"y" * 20)
+    assert model_fingerprint(str(path)) != before
+    assert model_fingerprint(str(tmp_path / "missing.gguf")) == ""
+
+
+def test_promoting_from_disk_releases_its_disk_budget(tmp_path):
+    c = cache(tmp_path, ram_bytes=1500)
+    c[[1, 2]] = State("first")
+    c[[3, 4]] = State("second")
+    spilled = c._disk_total
+    assert spilled > 0
+    # restoring "first" moves it back to RAM and spills "second" in its place
+    assert c[[1, 2, 5]].name == "first"
+    assert len(c._disk) == 1
+    assert c._disk_total == sum(size for _, size in c._disk.values())
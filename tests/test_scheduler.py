@@ -0,0 +1,61 @@
+import threading
+import time
+
+import pytest
+from utils.scheduler import ModelScheduler, SchedulerBusy
+
+
+def completion(name, log, gate=None):
+    def start():
+        if gate is not None:
+            gate.wait()
+        log.append(name)
+        yield from (f"{name}-{i}" for i in range(3))
+
+    return start
+
+
+def test_chunks_come_back_in_order():
+    scheduler = ModelScheduler()
+    assert list(scheduler.submit("s", completion("a", []))) == ["a-0", "a-1", "a-2"]
+
+
+def test_waiting_sessions_are_served_round_robin():
+    scheduler = ModelScheduler(max_queue=8, max_per_session=4)
+    log, gate = [], threading.Event()
+    results = [scheduler.submit("blocker", completion("blocker", log, gate))]
+    for name, session in [("a1", "a"), ("a2", "a"), ("a3", "a"), ("b1", "b")]:
+        results.append(scheduler.submit(session, completion(name, log)))
+    gate.set()
+    for chunks in results:
+        list(chunks)
+    assert log == ["blocker", "a1", "b1", "a2", "a3"]
+
+
+def test_requests_over_the_limits_are_refused():
+    scheduler = ModelScheduler(max_queue=2, max_per_session=1)
+    gate = threading.Event()
+    running = scheduler.submit("x", completion("x", [], gate))
+    # wait until "x" has left the queue for the worker
+    while scheduler.stats()["running"] != "x":
+        time.sleep(0.01)
+    waiting = [scheduler.submit("a", completion("a", []))]
+    with pytest.raises(SchedulerBusy):
+        scheduler.submit("a", completion("a2", []))
+    waiting.append(scheduler.submit("b", completion("b", [])))
+    with pytest.raises(SchedulerBusy):
+        scheduler.submit("c", completion("c", []))
+    assert scheduler.stats()["rejected"] == 2
+    gate.set()
+    for chunks in [running, *waiting]:
+        list(chunks)
+
+
+def test_errors_reach_the_caller():
+    scheduler = ModelScheduler()
+
+    def start():
+        raise RuntimeError("model failed")
+
+    with pytest.raises(RuntimeError, match="model failed"):
+        list(scheduler.submit("s", start))
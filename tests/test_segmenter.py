@@ -0,0 +1,34 @@
+import pytest
+from utils.segmenter import SentenceSegmenter
+
+
+def segment(text, min_length=1):
+    segmenter = SentenceSegmenter(min_length=min_length)
+    return segmenter.feed(text) + segmenter.flush()
+
+
+@pytest.mark.parametrize("word", ["best", "first", "last", "just", "dreams", "arms"])
+def test_words_ending_like_an_abbreviation_end_a_sentence(word):
+    assert segment(f"You are the {word}. I dream of you every night.") == [
+        f"You are the {word}.",
+        "I dream of you every night.",
+    ]
+
+
+@pytest.mark.parametrize("abbreviation", ["Mr.", "Mrs.", "Ms.", "Dr.", "St.", "vs.", "e.g.", "i.e."])
+def test_abbreviations_do_not_end_a_sentence(abbreviation):
+    assert segment(f"Ask {abbreviation} Smith about it. Then call me.") == [
+        f"Ask {abbreviation} Smith about it.",
+        "Then call me.",
+    ]
+
+
+def test_sentence_waits_for_the_following_whitespace():
+    segmenter = SentenceSegmenter(min_length=1)
+    assert segmenter.feed("It costs 3.") == []
+    assert segmenter.feed("5 dollars. And") == ["It costs 3.5 dollars."]
+    assert segmenter.flush() == ["And"]
+
+
+def test_short_sentences_are_merged():
+    assert segment("Hi. Oh. I missed you so much today.", min_length=20) == ["Hi. Oh. I missed you so much today."]
@@ -0,0 +1,11 @@
+from utils.tts_backends import BACKENDS, TTSBackend, available_backends
+
+
+def test_backends_without_their_packages_are_not_offered(monkeypatch):
+    monkeypatch.setitem(
+        BACKENDS, "missing", TTSBackend("missing", "Missing", "utils.missing", {}, "", requires=("no_such_package",))
+    )
+    names = available_backends()
+    assert "missing" not in names
+    # text only needs nothing
+    assert "null" in names
@@ -0,0 +1,33 @@
+import os
+
+import numpy as np
+from utils.tts_cache import TTSCache, cache_key
+
+
+def test_key_ignores_whitespace_but_not_voice_or_params():
+    assert cache_key("bark", "v1", "Hello  there\n") == cache_key("bark", "v1", "Hello there")
+    assert cache_key("bark", "v1", "Hello") != cache_key("bark", "v2", "Hello")
+    assert cache_key("bark", "v1", "Hello") != cache_key("bark", "v1", "Hello", tier="fast")
+
+
+def test_arrays_and_bytes_round_trip_across_instances(tmp_path):
+    cache = TTSCache(str(tmp_path), 1024 * 1024)
+    audio = np.linspace(-1, 1, 100, dtype=np.float32)
+    cache.put_array("a", audio)
+    cache.put_bytes("b", b"mp3 data")
+
+    reopened = TTSCache(str(tmp_path), 1024 * 1024)
+    np.testing.assert_array_equal(reopened.get_array("a"), audio)
+    assert bytes(reopened.get_bytes("b")) == b"mp3 data"
+    assert reopened.get_array("missing") is None
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = TTSCache(str(tmp_path), 2500)
+    for key in ("a", "b"):
+        cache.put_bytes(key, b"x" * 1000)
+    cache.get_bytes("a")
+    cache.put_bytes("c", b"x" * 1000)
+    assert cache.get_bytes("b") is None
+    assert cache.get_bytes("a") is not None and cache.get_bytes("c") is not None
+    assert sorted(os.listdir(tmp_path)) == ["a.mp3", "c.mp3"]